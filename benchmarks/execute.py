@@ -0,0 +1,93 @@
+'''Measures the cost of executing an already parsed module.
+
+"compiled once" walks the cached plan, "compiled every run" compiles
+the plan on every execution, "tree walking" is the interpreter executing
+activities of the tree before plans, looking up names and joining
+arguments of every activity on every run. The script fails when the
+cached plan is slower than tree walking.'''
+from timeit import timeit
+import sys
+from cookery.cookery import Cookery
+
+NUMBER = 2000
+REPEAT = 7
+
+SCRIPT = '''
+A = pass Value some arguments here.
+B = pass A and Value more arguments.
+pass B.
+pass.
+C = pass Value a b c d e f.
+pass A and B and C.
+'''
+
+
+def setup():
+    cookery = Cookery()
+
+    @cookery.action()
+    def pass_(*subjects):
+        return subjects
+
+    @cookery.subject('in', r'(.*)')
+    def value(arguments):
+        return arguments
+
+    cookery.actions['pass'] = cookery.actions.pop('pass_')
+    return cookery
+
+
+def tree_walking(module, implementation, value=None):
+    for activity in module.activities:
+        subjects = []
+        for subject in activity.subjects:
+            if subject.name in implementation.subjects:
+                subjects.append(implementation.subjects[subject.name](
+                    " ".join(subject.arguments)))
+            elif subject.name in module.variables:
+                subjects.append(module.variables[subject.name])
+            else:
+                raise NotImplementedError(
+                    "No subject {}".format(subject.name))
+        if activity.condition:
+            if activity.condition.name not in implementation.conditions:
+                raise NotImplementedError(
+                    "No condition {}".format(activity.condition.name))
+            condition = implementation.conditions[activity.condition.name]
+            subjects = [condition(s, " ".join(activity.condition.arguments))
+                        for s in subjects]
+        if len(subjects) == 0 and value:
+            subjects = value
+        if activity.action.name not in implementation.actions:
+            raise NotImplementedError(
+                "No action {}".format(activity.action.name))
+        arguments = activity.action.arguments
+        if isinstance(arguments, list):
+            arguments = " ".join(arguments)
+        value = implementation.actions[activity.action.name](subjects,
+                                                             arguments)
+        if activity.variable:
+            module.variables[activity.variable] = value
+    return value
+
+
+if __name__ == '__main__':
+    cookery = setup()
+    module = cookery.process_expression(SCRIPT)
+
+    def compiled_every_run():
+        module.plan = None
+        module.execute(cookery)
+
+    runs = [('compiled once', lambda: module.execute(cookery)),
+            ('compiled every run', compiled_every_run),
+            ('tree walking', lambda: tree_walking(module, cookery))]
+    # the best of interleaved repeats, so load of the machine affects all
+    times = {name: float('inf') for name, _ in runs}
+    for _ in range(REPEAT):
+        for name, stmt in runs:
+            times[name] = min(times[name], timeit(stmt, number=NUMBER))
+    for name, _ in runs:
+        print('{:20} {:8.2f} us per run'.format(
+            name, times[name] / NUMBER * 1e6))
+    sys.exit(0 if times['compiled once'] < times['tree walking'] else 1)
@@ -0,0 +1,61 @@
+'''Measures the overhead of calling implementations through Cookery.
+
+"direct" calls the function itself, the other rows call the registered
+adapters. "analysed every call" inspects the signature and matches an
+uncompiled regular expression on every call, like the wrappers did.'''
+import inspect
+import re
+from timeit import timeit
+from cookery.cookery import Cookery
+
+NUMBER = 1000000
+
+
+def setup():
+    cookery = Cookery()
+
+    @cookery.action()
+    def double(subject):
+        return subject
+
+    @cookery.action(r'(\d+)')
+    def times(subject, n):
+        return subject
+
+    @cookery.subject('in', r'(.*)')
+    def value(arguments):
+        return arguments
+
+    @cookery.condition()
+    def positive(value):
+        return value
+
+    return cookery
+
+
+def analysed_every_call(func, subjects):
+    parameters = len(inspect.signature(func).parameters)
+    matched = re.match(r'(\d+)', '3')
+    args = [] + subjects + list(matched.groups())
+    return func(*(args + [None] * (parameters - len(args))))
+
+
+if __name__ == '__main__':
+    cookery = setup()
+    subjects = [1]
+    double = cookery.actions['double']
+    times = cookery.actions['times']
+    value = cookery.subjects['Value']
+    positive = cookery.conditions['positive']
+    direct = double.__wrapped__
+
+    for name, stmt in [
+            ('direct', lambda: direct(1)),
+            ('action', lambda: double(subjects)),
+            ('action with regexp', lambda: times(subjects, '3')),
+            ('subject with regexp', lambda: value('some arguments')),
+            ('condition', lambda: positive(1, None)),
+            ('analysed every call',
+             lambda: analysed_every_call(times.__wrapped__, subjects))]:
+        t = timeit(stmt, number=NUMBER) / NUMBER
+        print('{:20} {:8.3f} us per call'.format(name, t * 1e6))
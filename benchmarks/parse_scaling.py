@@ -0,0 +1,35 @@
+'''Measures how parsing scales with the number of activities.
+
+Time and peak memory per activity should stay flat from 1k to 100k
+activities.'''
+from time import perf_counter
+import tracemalloc
+from cookery.cookery import Cookery
+
+SIZES = [1000, 10000, 100000]
+
+
+def script(size):
+    return "\n".join(
+        "R{0} = read File /data/input-{0}.txt with sample rate {0}.".
+        format(i) for i in range(size)
+    )
+
+
+if __name__ == '__main__':
+    cookery = Cookery()
+    for size in SIZES:
+        source = script(size)
+        start = perf_counter()
+        module = cookery.parse(source)
+        elapsed = perf_counter() - start
+        assert len(module.activities) == size
+        del module
+        tracemalloc.start()
+        cookery.parse(source)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('{:7d} activities {:8.3f} s {:6.2f} us/activity '
+              '{:8.1f} MB peak {:6.2f} KB/activity'.format(
+                  size, elapsed, elapsed / size * 1e6,
+                  peak / 2**20, peak / size / 2**10))
@@ -0,0 +1,53 @@
+'''Measures how long it takes to construct Cookery().
+
+Compares the lexer and parser built from the grammar (what Cookery did
+before the tables were shipped) with clones of the shared tables, and
+the standard library loaded from its manifest on first use with all of
+it executed up front.'''
+from os import path, listdir
+from timeit import timeit
+import ply.lex as lex
+import ply.yacc as yacc
+from cookery import cookery as cookery_module
+from cookery.cookery import Cookery
+from cookery.cookery_lex import CookeryLexer
+from cookery.cookery_parse import CookeryParser
+from cookery.cookery_tables import load_tables
+
+NUMBER = 20
+
+
+def from_grammar():
+    lex.lex(module=CookeryLexer())
+    yacc.yacc(module=CookeryParser(), write_tables=False, debug=False)
+
+
+def eval_do():
+    Cookery().execute_expression('do.')
+
+
+def eval_do_eager():
+    cookery = Cookery()
+    stdlib = path.join(path.dirname(path.abspath(cookery_module.__file__)),
+                       Cookery.STDLIB_PATH)
+    for f in sorted(listdir(stdlib)):
+        if f.endswith('.py'):
+            cookery.load_implementation(path.join(stdlib, f))
+    cookery.execute_expression('do.')
+
+
+def from_tables():
+    tables = load_tables()
+    tables.new_lexer()
+    tables.new_parser()
+
+
+if __name__ == '__main__':
+    Cookery()
+    for name, stmt in [('lexer and parser from grammar', from_grammar),
+                       ('lexer and parser from tables', from_tables),
+                       ('Cookery()', Cookery),
+                       ('eval "do." stdlib on first use', eval_do),
+                       ('eval "do." stdlib up front', eval_do_eager)]:
+        t = timeit(stmt, number=NUMBER) / NUMBER
+        print('{:32} {:8.3f} ms'.format(name, t * 1000))
@@ -1,63 +1,153 @@
-from .cookery_parse import CookeryParser
 from .cookery_lex import CookeryLexer
-from functools import wraps
-from os import path, listdir
-import ply.yacc as yacc
+from .cookery_scanner import CookeryScanner
+from .cookery_cache import ParseCache, ResultCache, file_digest
+from .cookery_tables import load_tables, ParserPool
+from .cookery_stream import iter_statements
+from .cookery_adapters import subject_adapter, action_adapter, \
+    condition_adapter, streaming, batched
+from .cookery_memo import SubjectCache
+from .cookery_registry import Registry, KINDS, MANIFEST, load_manifest, \
+    subject_name
+from .cookery_context import execution_path, resolve_path
+from functools import wraps, update_wrapper
+from os import path, getpid, stat
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock
 import ply.lex as lex
 import runpy
+import json
 import re
 import inspect
 import logging
 from operator import methodcaller
-from .exceptions import \
-    CookeryWrongMatch, \
-    CookeryWrongNumberOfArguments, \
-    CookeryCannotImportModule
+from .exceptions import CookeryCannotImportModule
 
 
 class Cookery(object):
     STDLIB_PATH = 'stdlib'
 
     def __init__(self, debug=False, debug_lexer=False,
-                 debug_parser=False, jupyter=False):
+                 debug_parser=False, jupyter=False, cache_dir=None,
+                 scanner=False, workers=None, executor='thread',
+                 subject_workers=None, map_workers=None,
+                 map_executor='process', subject_cache_size=128):
         if not jupyter:
             self.init_logging(debug)
         self.init_logging(debug)
-        self.lexer = lex.lex(module=CookeryLexer(), debug=debug_lexer)
+        tables = load_tables()
+        # prototype of lexers, every parse uses its own clone
+        if scanner:
+            self.lexer = CookeryScanner()
+        elif debug_lexer:
+            self.lexer = lex.lex(module=CookeryLexer(), debug=debug_lexer)
+        else:
+            self.lexer = tables.new_lexer()
         self.debug_parser = debug_parser
-        self.parser = yacc.yacc(module=CookeryParser())
+        self.parsers = ParserPool(self.lexer.clone, tables.new_parser)
+        self.parse_cache = None
+        self.result_cache = None
+        if cache_dir is not None:
+            self.parse_cache = ParseCache(path.join(cache_dir, 'ast'))
+            self.result_cache = ResultCache(path.join(cache_dir, 'results'))
+        # independent activities run concurrently when workers are set
+        self.workers = workers
+        self.executor = executor
+        # subjects of one activity are loaded concurrently when set
+        self.subject_workers = subject_workers
+        self._subject_pool = None
+        self._subject_pool_pid = None
+        # actions mapped over T[] are spread over a pool when set
+        self.map_workers = map_workers
+        self.map_executor = map_executor
+        # values of subjects declared with cache=True
+        self.subject_cache = SubjectCache(subject_cache_size)
         self.protocols = {}
         self.protocol_instances = {}
-        self.subjects = {}
-        self.actions = {}
-        self.conditions = {}
+        self._loaded = set()
+        # shared by the registries, a file is loaded by one thread at once
+        self._loading = RLock()
+        self.subjects = Registry(self.load_implementation, self._loading)
+        self.actions = Registry(self.load_implementation, self._loading)
+        self.conditions = Registry(self.load_implementation, self._loading)
+        # directories of scripts whose manifests were provided
+        self._provided = set()
+        # implementation file -> modification time when it was executed
+        self._implementations = {}
         stdlib_path = path.join(path.dirname(path.abspath(__file__)),
                                 self.STDLIB_PATH)
-        for f in filter(methodcaller('endswith', '.py'),
-                        listdir(stdlib_path)):
-            self.process_implementation(path.join(stdlib_path, f))
+        self.provide(stdlib_path)
+
+    def provide(self, directory, replace=False):
+        '''Registers implementations of a directory, executed on first use.
+        With replace, they take precedence over the ones provided before.'''
+        for f, names in load_manifest(directory).items():
+            for kind in KINDS:
+                registry = getattr(self, kind)
+                for name in names[kind]:
+                    registry.provide(name, path.join(directory, f), replace)
+
+    def load_implementation(self, file_name):
+        'Executes an implementation file provided by a manifest once.'
+        with self._loading:
+            if file_name in self._loaded:
+                return
+            self._loaded.add(file_name)
+            self.log.debug('loading {}'.format(file_name))
+            # implementations registered before (e.g. by the project)
+            # take precedence over the ones loaded on demand
+            registered = [(getattr(self, kind), dict(getattr(self, kind)))
+                          for kind in KINDS]
+            try:
+                self.process_implementation(file_name)
+            except BaseException:
+                self._loaded.discard(file_name)
+                raise
+            for registry, before in registered:
+                # and names provided by other files are left to them
+                for name, other in registry.files.items():
+                    if other != file_name and name not in before:
+                        dict.pop(registry, name, None)
+                dict.update(registry, before)
+
+    def subject_pool(self):
+        'Returns a pool loading subjects of one activity, or None.'
+        if not self.subject_workers:
+            return None
+        # a pool inherited by a forked worker has no threads
+        if self._subject_pool is None or self._subject_pool_pid != getpid():
+            self._subject_pool = ThreadPoolExecutor(self.subject_workers)
+            self._subject_pool_pid = getpid()
+        return self._subject_pool
 
     def init_logging(self, debug):
         self.log = logging.getLogger('Cookery')
         if debug:
             logging.basicConfig(level=logging.DEBUG)
 
-    def process_expression(self, expression, relative=None):
-        m = self.parser.parse(expression,
-                              lexer=self.lexer,
-                              debug=self.debug_parser)
+    def process_expression(self, expression, relative=None, cache=True):
+        m = None
+        if cache and self.parse_cache is not None:
+            m = self.parse_cache.load(expression, relative)
         if m is None:
-            return None
+            m = self.parse(expression)
+            if m is None:
+                return None
+            if cache and self.parse_cache is not None:
+                self.parse_cache.store(expression, m, relative)
         if relative is not None:
             m.execution_path = path.abspath(relative)
         self.log.debug('module: {}'.format(m.pretty_print()))
-        self.parser.restart()
-        self.lexer.begin('INITIAL')
         self.process_imports(m, relative=relative)
         self.log.debug('imports: {}'.format(m.modules))
         self.__instantiate_protocols()
         return m
 
+    def parse(self, expression):
+        "Parses an expression into a Module, returns None on syntax error"
+        with self.parsers.parser() as (lexer, parser):
+            return parser.parse(expression, lexer=lexer,
+                                debug=self.debug_parser)
+
     def process_imports(self, module, relative=None):
         for m in module.modules.keys():
             module.modules[m] = self.load_module(module.modules[m], relative)
@@ -94,26 +184,90 @@ class Cookery(object):
             implementations.append(path.join(relative, implementation))
         for implementation in implementations:
             if path.exists(implementation):
-                runpy.run_path(implementation, {'cookery': self})
+                self.run_implementation(implementation)
                 break
         else:
             raise NotImplementedError(implementation)
 
         return implementation
 
+    def run_implementation(self, file_name):
+        'Executes an implementation file, again only after it changes.'
+        mtime = stat(file_name).st_mtime_ns
+        with self._loading:
+            if self._implementations.get(file_name) == mtime:
+                return
+            self._implementations[file_name] = mtime
+            runpy.run_path(file_name, {'cookery': self})
+
     def load_module(self, file, relative=None):
+        if relative is None:
+            # imports of a module being executed
+            relative = execution_path.get()
         module = self.process_file(file, relative)
+        directory = module.execution_path
+        if path.exists(path.join(directory, MANIFEST)):
+            # implementations of the project are executed on first use
+            with self._loading:
+                if directory not in self._provided:
+                    self._provided.add(directory)
+                    self.provide(directory, replace=True)
+            return module
         try:
             self.process_implementation(file, relative)
         except NotImplementedError:
             pass
         return module
 
+    @staticmethod
+    def resolve_path(file_name):
+        'Resolves a path relative to the module being executed.'
+        return resolve_path(file_name)
+
     def execute_file(self, file):
         module = self.load_module(file)
         self.__instantiate_protocols()
         return module.execute(self)
 
+    async def execute_file_async(self, file):
+        'Executes a file on the running event loop.'
+        module = self.load_module(file)
+        self.__instantiate_protocols()
+        return await module.execute_async(self)
+
+    async def execute_expression_async(self, expression):
+        module = self.process_expression(expression)
+        if module is None:
+            return "syntax error"
+        self.__instantiate_protocols()
+        return await module.execute_async(self)
+
+    def execute_stream(self, file):
+        '''Executes a file statement by statement, yields their values.
+
+        Every statement is parsed and executed as soon as it is read, so
+        it works with pipes and memory does not grow with the script.'''
+        try:
+            self.process_implementation(file)
+        except NotImplementedError:
+            pass
+        relative = path.dirname(file.name)
+        module = None
+        value = None
+        for statement in iter_statements(file, self.lexer.clone()):
+            m = self.process_expression(statement, relative, cache=False)
+            if m is None:
+                self.log.warning('syntax error in: {}'.format(statement))
+                continue
+            if module is None:
+                module = m
+            else:
+                module.modules.update(m.modules)
+                module.activities = m.activities
+            self.__instantiate_protocols()
+            value = module.execute(self, value)
+            yield value
+
     def execute_expression(self, expression):
         module = self.process_expression(expression)
         if module is None:
@@ -134,77 +288,97 @@ class Cookery(object):
     def complete(self, expression):
         'Completes the code, todo: complete words, not only tokens.'
 
-        self.parser.parse(expression, lexer=self.lexer)
-        self.log.debug('complete action: {}'.
-                       format(self.parser.action))
-        self.log.debug('complete statestack: {}'.
-                       format(self.parser.statestack))
-        self.log.debug('complete symstack: {}'.
-                       format(self.parser.symstack))
-        stack = self.parser.symstack[-1]
-        self.log.debug('stack: {}'.format(stack))
-        if stack not in ['include', '$end']:
-            action = self.parser.action[self.parser.statestack[-1]]
-            possibilities = action.keys()
-            self.log.debug("possibilities are: {}".format(possibilities))
-            result = list(map(methodcaller('lower'),
-                              set(possibilities) &
-                              set(['IMPORT', 'AND', 'AS', '='])))
-
-            if len(self.conditions) > 0:
-                result += list(map(methodcaller('lower'),
-                                   set(possibilities) &
-                                   set(['IF', 'WITH'])))
-
-            if len(expression) > 0:
-                if not re.match(r'\s', expression[-1]):
-                    if 'END' in possibilities:
-                        return [' ', '.']
-                    else:
-                        return [' ']
-
-            for p in possibilities:
-                if p == 'ACTION':
-                    result += self.actions.keys()
-                elif p == 'SUBJECT':
-                    result += self.subjects.keys()
-                elif p == 'CONDITION':
-                    result += self.conditions.keys()
-                # elif p == 'JSON':
-                #     result +=
-                # elif p == 'ACTION_ARGUMENT':
-                #     result +=
-                # elif p == 'SUBJECT_ARGUMENT':
-                #     result +=
-                # elif p == 'CONDITION_ARGUMENT':
-                #     result +=
-            return result
-        self.parser.restart()
-        self.lexer.begin('INITIAL')
-        return ""
-
-    def subject(self, type, regexp=None):
+        with self.parsers.parser() as (lexer, parser):
+            parser.parse(expression, lexer=lexer)
+            self.log.debug('complete action: {}'.
+                           format(parser.action))
+            self.log.debug('complete statestack: {}'.
+                           format(parser.statestack))
+            self.log.debug('complete symstack: {}'.
+                           format(parser.symstack))
+            stack = parser.symstack[-1]
+            self.log.debug('stack: {}'.format(stack))
+            if stack not in ['include', '$end']:
+                action = parser.action[parser.statestack[-1]]
+                possibilities = action.keys()
+                self.log.debug("possibilities are: {}".format(possibilities))
+                result = list(map(methodcaller('lower'),
+                                  set(possibilities) &
+                                  set(['IMPORT', 'AND', 'AS', '='])))
+
+                if len(self.conditions) > 0:
+                    result += list(map(methodcaller('lower'),
+                                       set(possibilities) &
+                                       set(['IF', 'WITH'])))
+
+                if len(expression) > 0:
+                    if not re.match(r'\s', expression[-1]):
+                        if 'END' in possibilities:
+                            return [' ', '.']
+                        else:
+                            return [' ']
+
+                for p in possibilities:
+                    if p == 'ACTION':
+                        result += self.actions.keys()
+                    elif p == 'SUBJECT':
+                        result += self.subjects.keys()
+                    elif p == 'CONDITION':
+                        result += self.conditions.keys()
+                    # elif p == 'JSON':
+                    #     result +=
+                    # elif p == 'ACTION_ARGUMENT':
+                    #     result +=
+                    # elif p == 'SUBJECT_ARGUMENT':
+                    #     result +=
+                    # elif p == 'CONDITION_ARGUMENT':
+                    #     result +=
+                return result
+            return ""
+
+    def subject(self, type, regexp=None, join=None,
+                cache=False, ttl=None, validate=None, protocol=None):
+        '''Registers a subject.
+
+        Results of generator functions are wrapped in a lazy Stream,
+        join materializes it for actions that do not consume streams.
+        With cache set values are kept in subject_cache for ttl seconds,
+        or until validate (called with the same arguments) changes.
+        An instance of protocol is passed as the first argument.'''
+        protocol_instance = self.__protocol_instance(protocol)
+
         def decorator(func):
-            @wraps(func)
-            def wrapper(arguments):
-                if regexp is None:
-                    return func()
-                if regexp == 'JSON':
-                    return func(arguments)
-                matched = re.match(regexp, arguments)
-                if matched:
-                    return func(*matched.groups())
-                else:
-                    self.log.error("Subject {} data unmatched".
-                                   format(func.__name__))
-                return func()
-            # changes func name from foo_bar to FooBar
-            func_name = "".join([e.capitalize() for e in
-                                 func.__name__.split('_')])
-            self.subjects[func_name] = wrapper
+            load = streaming(func, join)
+            if protocol_instance is not None:
+                implementation = load
+
+                @wraps(func)
+                def load(*args):
+                    return implementation(protocol_instance(), *args)
+
+            if cache:
+                @wraps(func)
+                def load_cached(*args):
+                    # relative paths are resolved against the module
+                    key = (func.__name__, execution_path.get(),
+                           json.dumps(args, sort_keys=True, default=repr))
+                    return self.subject_cache.get(key, load, args,
+                                                  ttl, validate)
+                wrapper = subject_adapter(load_cached, regexp)
+            else:
+                wrapper = subject_adapter(load, regexp)
+            update_wrapper(wrapper, func)
+            self.subjects[subject_name(func.__name__)] = wrapper
             return wrapper
         return decorator
 
+    def __source(self, func):
+        'Returns a hash of the implementation file of func.'
+        try:
+            return file_digest(inspect.getsourcefile(func))
+        except (OSError, TypeError):
+            return None
+
     def __proto_name(self, protocol):
         return protocol.__name__
 
@@ -216,67 +390,55 @@ class Cookery(object):
             self.protocols[self.__proto_name(protocol)] = protocol
             return protocol
 
-    def action(self, regexp=None, protocol=None):
-        print("REGEXP", regexp, "PROTOCOL", protocol)
-        if protocol is not None:
-            protocol = self.__add_proto(protocol)
+    def __protocol_instance(self, protocol):
+        'Returns a function returning the instance of protocol, or None.'
+        if protocol is None:
+            return None
+        protocol = self.__add_proto(protocol)
+        name = self.__proto_name(protocol)
+        instances = self.protocol_instances
+
+        def protocol_instance():
+            try:
+                return instances[name]
+            except KeyError:
+                # registered by a file loaded after the script
+                self.__instantiate_protocols()
+                return instances[name]
+        return protocol_instance
+
+    def action(self, regexp=None, protocol=None, stream=False, join=None,
+               cache=False, batch=None, batch_workers=None):
+        '''Registers an action.
+
+        Streams among subjects are materialized and mapped files decoded
+        unless stream is set.
+        Results of generator functions are wrapped in a lazy Stream,
+        materialized with join. With cache set, results are kept in
+        result_cache, for pure actions whose result depends only on their
+        input and arguments.
+        With batch set, the first subject, if it is a list, is split into
+        batches of that size and the action is called once per batch, with
+        the other subjects unchanged (concurrently on batch_workers
+        threads). It returns a list, the results are concatenated.'''
+        protocol_instance = self.__protocol_instance(protocol)
 
         def decorator(func):
-            @wraps(func)
-            def wrapper(subjects=None, arguments=None):
-                parameters = len(inspect.signature(func).parameters)
-
-                function_args = []
-
-                if protocol is not None:
-                    function_args.append(
-                        self.protocol_instances[self.__proto_name(protocol)]
-                    )
-
-                if regexp == 'JSON':
-                    if parameters == len(function_args) + 1:
-                        function_args.append(arguments)
-                    elif parameters == len(function_args) + 2:
-                        function_args += [subjects, arguments]
-                    else:
-                        raise CookeryWrongNumberOfArguments()
-                elif regexp is not None:
-                    matched = re.match(regexp, arguments)
-                    if matched:
-                        print(function_args, matched.groups(), parameters)
-                        if parameters == len(function_args) + \
-                           len(matched.groups()) + 1:
-                            function_args += subjects
-                            function_args += matched.groups()
-                        else:
-                            raise CookeryWrongNumberOfArguments()
-                    else:
-                        raise CookeryWrongMatch()
-                else:
-                    if subjects is not None and len(subjects) > 0:
-                        function_args += subjects
-                return func(*(
-                    function_args +
-                    [None] * (parameters - len(function_args))
-                ))
+            wrapper = action_adapter(streaming(func, join), regexp,
+                                     protocol_instance, stream)
+            if batch:
+                wrapper = batched(wrapper, batch, batch_workers, stream)
+            update_wrapper(wrapper, func)
+            wrapper.cache = cache
+            wrapper.source = self.__source(func)
             self.actions[func.__name__] = wrapper
             return wrapper
         return decorator
 
     def condition(self, regexp=None):
         def decorator(func):
-            @wraps(func)
-            def wrapper(value, arguments):
-                if regexp == 'JSON':
-                    return func(value, arguments)
-                if regexp:
-                    matched = re.match(regexp, arguments)
-                    if matched:
-                        return func(value, *matched.groups())
-                    else:
-                        pass  # handle unmached data
-                return func(value)
-            self.conditions[func.__name__] = func
+            wrapper = update_wrapper(condition_adapter(func, regexp), func)
+            self.conditions[func.__name__] = wrapper
             return wrapper
         return decorator
 
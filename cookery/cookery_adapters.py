@@ -0,0 +1,172 @@
+'''Adapters calling implementations with Cookery data.
+
+The regular expression and the signature of an implementation are
+analysed once, when it is registered, and the returned adapter only does
+what is needed for that implementation on every call.'''
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import wraps
+import inspect
+import logging
+import re
+from .cookery_mapped import MappedFile
+from .cookery_stream import Stream, materialize
+from .exceptions import CookeryWrongMatch, CookeryWrongNumberOfArguments
+
+log = logging.getLogger('Cookery')
+
+
+def _parameters(func):
+    return len(inspect.signature(func).parameters)
+
+
+def _padding(parameters, given):
+    return (None,) * max(0, parameters - given)
+
+
+def subject_adapter(func, regexp=None):
+    'Returns adapter(arguments) calling a subject.'
+    if regexp is None:
+        return lambda arguments: func()
+    if regexp == 'JSON':
+        return lambda arguments: func(arguments)
+    match = re.compile(regexp).match
+
+    def adapter(arguments):
+        matched = match(arguments)
+        if matched:
+            return func(*matched.groups())
+        log.error("Subject {} data unmatched".format(func.__name__))
+        return func()
+    return adapter
+
+
+def condition_adapter(func, regexp=None):
+    '''Returns adapter(value, arguments) calling a condition.
+
+    Conditions receive streams materialized, like actions without
+    stream=True.'''
+    if regexp == 'JSON':
+        return lambda value, arguments: func(materialize(value), arguments)
+    if not regexp:
+        return lambda value, arguments: func(materialize(value))
+    match = re.compile(regexp).match
+
+    def adapter(value, arguments):
+        value = materialize(value)
+        matched = match(arguments)
+        if matched:
+            return func(value, *matched.groups())
+        return func(value)
+    return adapter
+
+
+def action_adapter(func, regexp=None, protocol=None, stream=False):
+    '''Returns adapter(subjects, arguments) calling an action.
+
+    protocol is a function returning the protocol instance, called on
+    every call since instances are created after registration.'''
+    parameters = _parameters(func)
+    given = 0 if protocol is None else 1
+
+    if regexp == 'JSON':
+        if parameters == given + 1:
+            def call(head, subjects, arguments):
+                return func(*head, arguments)
+        elif parameters == given + 2:
+            def call(head, subjects, arguments):
+                return func(*head, subjects, arguments)
+        else:
+            def call(head, subjects, arguments):
+                raise CookeryWrongNumberOfArguments()
+    elif regexp is not None:
+        match = re.compile(regexp).match
+        groups = match.__self__.groups
+        # subjects are spread, so one subject is expected
+        arity = parameters == given + groups + 1
+
+        def call(head, subjects, arguments):
+            matched = match(arguments)
+            if not matched:
+                raise CookeryWrongMatch()
+            if not arity:
+                raise CookeryWrongNumberOfArguments()
+            args = (*head, *subjects, *matched.groups())
+            if len(args) < parameters:
+                args += _padding(parameters, len(args))
+            return func(*args)
+    else:
+        def call(head, subjects, arguments):
+            args = (*head, *subjects) if subjects else head
+            if len(args) < parameters:
+                args += _padding(parameters, len(args))
+            return func(*args)
+
+    if protocol is None and not stream and regexp is None and \
+       parameters == 1:
+        # the most common case, a single subject
+        def adapter(subjects=None, arguments=None):
+            subjects = materialize(subjects)
+            if subjects:
+                return func(*subjects)
+            return func(None)
+        return adapter
+
+    if stream:
+        def prepare(subjects):
+            if isinstance(subjects, (Stream, MappedFile)):
+                return [subjects]
+            return subjects
+    else:
+        prepare = materialize
+
+    if protocol is None:
+        def adapter(subjects=None, arguments=None):
+            return call((), prepare(subjects), arguments)
+    else:
+        def adapter(subjects=None, arguments=None):
+            return call((protocol(),), prepare(subjects), arguments)
+    return adapter
+
+
+def streaming(func, join=None):
+    'Wraps results of generator functions in a Stream.'
+    if not inspect.isgeneratorfunction(func):
+        return func
+    join = join or list
+
+    @wraps(func)
+    def stream(*args):
+        return Stream(func(*args), join)
+    return stream
+
+
+def batched(adapter, size, workers=None, stream=False):
+    '''Returns adapter(subjects, arguments) calling adapter on batches of
+    at most size elements of the first subject, with the other subjects
+    as they are, and concatenating the lists it returns.
+
+    Batches are called concurrently on a pool of threads when workers are
+    set. A first subject other than a list or a tuple is passed as it is.'''
+    def batches(subjects=None, arguments=None):
+        if not stream:
+            subjects = materialize(subjects)
+        if subjects.__class__ is not list or not subjects or \
+           not isinstance(subjects[0], (list, tuple)):
+            return adapter(subjects, arguments)
+        items, rest = subjects[0], subjects[1:]
+        calls = [[items[i:i + size]] + rest
+                 for i in range(0, len(items), size)]
+        if workers and len(calls) > 1:
+            with ThreadPoolExecutor(workers) as pool:
+                futures = [pool.submit(copy_context().run, adapter,
+                                       call, arguments)
+                           for call in calls]
+                results = [future.result() for future in futures]
+        else:
+            results = [adapter(call, arguments) for call in calls]
+        flat = []
+        for result in results:
+            flat.extend(result)
+        return flat
+    return batches
@@ -0,0 +1,153 @@
+from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, time, timezone
+from decimal import Decimal
+from threading import Lock
+import json
+import logging
+from .cookery_context import resolve_path
+
+log = logging.getLogger('Cookery')
+
+
+def _boolean(value):
+    return value.lower() == 'true'
+
+
+def _timestamp(value):
+    return datetime.fromtimestamp(float(value), timezone.utc)
+
+
+# conversion of cells from their JSON representation, by field type
+CONVERTERS = {
+    'INTEGER': int,
+    'INT64': int,
+    'FLOAT': float,
+    'FLOAT64': float,
+    'NUMERIC': Decimal,
+    'BIGNUMERIC': Decimal,
+    'BOOLEAN': _boolean,
+    'BOOL': _boolean,
+    'TIMESTAMP': _timestamp,
+    'DATE': date.fromisoformat,
+    'TIME': time.fromisoformat,
+    'DATETIME': datetime.fromisoformat,
+    'BYTES': b64decode,
+}
+
+
+def row_converter(fields):
+    'Returns a function turning a row of the API into a dict.'
+    columns = []
+    for field in fields:
+        if field['type'] in ('RECORD', 'STRUCT'):
+            convert = row_converter(field.get('fields', []))
+        else:
+            convert = CONVERTERS.get(field['type'], str)
+        if field.get('mode') == 'REPEATED':
+            def cell(value, convert=convert):
+                return [None if v['v'] is None else convert(v['v'])
+                        for v in value]
+        else:
+            cell = convert
+        columns.append((field['name'], cell))
+
+    def row(value):
+        return {name: None if c['v'] is None else cell(c['v'])
+                for (name, cell), c in zip(columns, value['f'])}
+    return row
+
+
+class BigQueryClient(object):
+    '''Protocol of BigQuery actions, one per Cookery instance.
+
+    The service is built on first use and shared by all queries, tests
+    can assign a fake service instead.'''
+
+    key_file = 'Cookery-30137725a678.json'
+    project = 'symbolic-button-852'
+    # time the API waits for a query before returning an incomplete job
+    timeout_ms = 10000
+
+    def __init__(self):
+        self._service = None
+        self.lock = Lock()
+
+    @property
+    def service(self):
+        with self.lock:
+            if self._service is None:
+                self._service = self.build()
+            return self._service
+
+    @service.setter
+    def service(self, service):
+        self._service = service
+
+    def build(self):
+        from oauth2client.client import SignedJwtAssertionCredentials
+        from apiclient import discovery
+        from httplib2 import Http
+
+        with open(resolve_path(self.key_file)) as f:
+            json_key = json.load(f)
+
+        credentials = SignedJwtAssertionCredentials(
+            json_key['client_email'],
+            json_key['private_key'].encode(),
+            'https://www.googleapis.com/auth/bigquery')
+
+        http = Http()
+        credentials.authorize(http)
+        return discovery.build('bigquery', 'v2', http=http)
+
+    def results(self, job, page_token=None):
+        'Returns a page of results of a job, waits until it completes.'
+        reference = job['jobReference']
+        while True:
+            arguments = {'projectId': reference['projectId'],
+                         'jobId': reference['jobId'],
+                         'timeoutMs': self.timeout_ms}
+            if 'location' in reference:
+                arguments['location'] = reference['location']
+            if page_token is not None:
+                arguments['pageToken'] = page_token
+            page = self.service.jobs().getQueryResults(**arguments).execute()
+            if page.get('jobComplete', True):
+                return page
+            log.debug('waiting for job {}'.format(reference['jobId']))
+
+    def pages(self, query, prefetch=True):
+        '''Yields pages of results of a query as they are needed.
+
+        With prefetch the next page is fetched in a background thread
+        while the current one is consumed.'''
+        job = page = self.service.jobs().query(projectId=self.project,
+                                               body=query).execute()
+        if not page.get('jobComplete', True):
+            page = self.results(job)
+        if not prefetch:
+            while True:
+                yield page
+                if not page.get('pageToken'):
+                    return
+                page = self.results(job, page['pageToken'])
+        with ThreadPoolExecutor(1) as pool:
+            while True:
+                following = None
+                if page.get('pageToken'):
+                    following = pool.submit(self.results, job,
+                                            page['pageToken'])
+                yield page
+                if following is None:
+                    return
+                page = following.result()
+
+    def rows(self, query, prefetch=True):
+        'Yields rows of a query as dicts of converted values.'
+        convert = None
+        for page in self.pages(query, prefetch):
+            if convert is None:
+                convert = row_converter(page['schema']['fields'])
+            for row in page.get('rows', []):
+                yield convert(row)
@@ -0,0 +1,231 @@
+from os import path, makedirs, replace, environ, getpid, remove, stat, \
+    utime, walk
+from time import time
+import hashlib
+import io
+import logging
+import pickle
+from .cookery_mapped import MappedFile
+from .cookery_stream import Stream, FileStream
+
+DEFAULT_CACHE_DIR = path.join(
+    environ.get('XDG_CACHE_HOME', path.expanduser(path.join('~', '.cache'))),
+    'cookery'
+)
+
+# modules that define the token stream and the grammar, read without
+# importing them so the command line does not load the parser
+GRAMMAR_MODULES = ('cookery_lex.py', 'cookery_parse.py')
+
+_signatures = {}
+
+
+def signature(modules):
+    'Returns a hash of the source of modules.'
+    if modules not in _signatures:
+        digest = hashlib.sha256()
+        for module in modules:
+            with open(path.join(path.dirname(__file__), module), 'rb') as f:
+                digest.update(f.read())
+        _signatures[modules] = digest.hexdigest()
+    return _signatures[modules]
+
+
+def grammar_signature():
+    'Returns a hash of the lexer and the grammar.'
+    return signature(GRAMMAR_MODULES)
+
+
+class ParseCache(object):
+    '''Keeps parsed Module trees on disk, keyed by a hash of the source.
+
+    A relative directory is resolved against the directory of the script
+    being parsed, so the cache can live next to the scripts.'''
+
+    log = logging.getLogger('Cookery')
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def key(self, source):
+        # trees are invalidated by changes of the AST classes as well
+        digest = hashlib.sha256(
+            signature(GRAMMAR_MODULES + ('cookery_elements.py',)).encode()
+        )
+        digest.update(source.encode())
+        return digest.hexdigest()
+
+    def path(self, source, relative=None):
+        directory = self.directory
+        if relative is not None and not path.isabs(directory):
+            directory = path.join(relative, directory)
+        key = self.key(source)
+        return path.join(directory, key[:2], key + '.pickle')
+
+    def load(self, source, relative=None):
+        file_name = self.path(source, relative)
+        try:
+            with open(file_name, 'rb') as f:
+                module = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.log.warning('cannot load cached module {}: {}'.
+                             format(file_name, e))
+            return None
+        try:
+            # marks the entry as used for gc
+            utime(file_name)
+        except OSError:
+            pass
+        self.log.debug('module loaded from cache: {}'.format(file_name))
+        return module
+
+    def store(self, source, module, relative=None):
+        file_name = self.path(source, relative)
+        temp_name = '{}.{}'.format(file_name, getpid())
+        try:
+            makedirs(path.dirname(file_name), exist_ok=True)
+            with open(temp_name, 'wb') as f:
+                pickle.dump(module, f, pickle.HIGHEST_PROTOCOL)
+            replace(temp_name, file_name)
+        except (OSError, pickle.PicklingError) as e:
+            self.log.warning('cannot cache module {}: {}'.
+                             format(file_name, e))
+
+
+# path -> (mtime, size, hash)
+_digests = {}
+
+
+def file_digest(file_name):
+    'Returns a hash of a file, memoized until the file changes.'
+    file_name = path.abspath(file_name)
+    s = stat(file_name)
+    digest = _digests.get(file_name)
+    if digest is None or digest[:2] != (s.st_mtime_ns, s.st_size):
+        with open(file_name, 'rb') as f:
+            digest = (s.st_mtime_ns, s.st_size,
+                      hashlib.sha256(f.read()).hexdigest())
+        _digests[file_name] = digest
+    return digest[2]
+
+
+class _Fingerprint(pickle.Pickler):
+    '''Pickles values for hashing, mapped files and file streams by their
+    path and mtime.'''
+
+    def persistent_id(self, obj):
+        if isinstance(obj, MappedFile):
+            s = stat(obj.file_name)
+            return ('MappedFile', obj.file_name, s.st_mtime_ns, s.st_size)
+        if isinstance(obj, FileStream):
+            s = stat(obj.file_name)
+            return ('FileStream', obj.file_name, s.st_mtime_ns, s.st_size)
+        if isinstance(obj, Stream):
+            raise pickle.PicklingError('streams cannot be fingerprinted')
+        return None
+
+
+class ResultCache(object):
+    '''Keeps results of actions on disk, keyed by a hash of the action,
+    its arguments, the source of its implementation and its input.
+
+    A relative directory is resolved against the directory of the script,
+    as in ParseCache.'''
+
+    log = logging.getLogger('Cookery')
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    @staticmethod
+    def prefix(action, arguments, source, mapping=((), False)):
+        '''Returns the part of keys that is known before a step runs.
+
+        mapping is (positions of T[] subjects, whether the variable is
+        T[]), a mapped action returns a list of results of its items.'''
+        digest = hashlib.sha256()
+        for part in [action, repr(arguments), source, repr(mapping)]:
+            digest.update(part.encode())
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def key(self, prefix, value):
+        'Returns a key of value given to an action, None if unhashable.'
+        digest = hashlib.sha256(prefix.encode())
+        stream = io.BytesIO()
+        try:
+            _Fingerprint(stream, pickle.HIGHEST_PROTOCOL).dump(value)
+        except Exception as e:
+            self.log.debug('result not cached: {}'.format(e))
+            return None
+        digest.update(stream.getvalue())
+        return digest.hexdigest()
+
+    def path(self, key, relative=None):
+        directory = self.directory
+        if relative is not None and not path.isabs(directory):
+            directory = path.join(relative, directory)
+        return path.join(directory, key[:2], key + '.pickle')
+
+    def load(self, key, relative=None):
+        'Returns (True, result) of a cached key, (False, None) otherwise.'
+        file_name = self.path(key, relative)
+        try:
+            with open(file_name, 'rb') as f:
+                result = pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except Exception as e:
+            self.log.warning('cannot load cached result {}: {}'.
+                             format(file_name, e))
+            return False, None
+        try:
+            # marks the entry as used for gc
+            utime(file_name)
+        except OSError:
+            pass
+        self.log.debug('result loaded from cache: {}'.format(file_name))
+        return True, result
+
+    def store(self, key, result, relative=None):
+        if isinstance(result, Stream):
+            self.log.debug('stream result not cached')
+            return
+        file_name = self.path(key, relative)
+        temp_name = '{}.{}'.format(file_name, getpid())
+        try:
+            makedirs(path.dirname(file_name), exist_ok=True)
+            with open(temp_name, 'wb') as f:
+                pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+            replace(temp_name, file_name)
+        except Exception as e:
+            self.log.warning('cannot cache result {}: {}'.
+                             format(file_name, e))
+            try:
+                remove(temp_name)
+            except OSError:
+                pass
+
+
+def collect_garbage(directory, max_age):
+    '''Removes cache entries unused for max_age seconds.
+
+    Returns the number of removed files and their size.'''
+    deadline = time() - max_age
+    removed = 0
+    size = 0
+    for root, _, files in walk(directory):
+        for name in files:
+            file_name = path.join(root, name)
+            try:
+                s = stat(file_name)
+                # leftovers of interrupted writes included
+                if s.st_mtime < deadline:
+                    remove(file_name)
+                    removed += 1
+                    size += s.st_size
+            except OSError:
+                pass
+    return removed, size
@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from os import path
+
+# directory of the module being executed, relative paths are resolved
+# against it instead of changing the working directory of the process
+execution_path = ContextVar('execution_path', default=None)
+
+
+def resolve_path(file_name, relative=None):
+    'Resolves a relative path against the directory of the module.'
+    if relative is None:
+        relative = execution_path.get()
+    if relative is None or path.isabs(file_name):
+        return file_name
+    return path.join(relative, file_name)
+
+
+@contextmanager
+def executing(directory):
+    'Runs the block in the context of a module in directory.'
+    if directory is None:
+        yield
+        return
+    token = execution_path.set(directory)
+    try:
+        yield
+    finally:
+        execution_path.reset(token)
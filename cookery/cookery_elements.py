@@ -1,5 +1,6 @@
 import logging
-from os import path, chdir
+from .cookery_plan import compile_module
+from .cookery_stream import materialize
 
 
 class Module:
@@ -13,15 +14,31 @@ class Module:
         self.activities = activities or []
         self.variables = {}
         self.execution_path = None
+        self.plan = None
+
+    def compile(self, implementation):
+        "Returns a plan of activities, compiled once per implementation"
+        if self.plan is None or \
+           self.plan.implementation is not implementation or \
+           self.plan.activities is not self.activities:
+            self.plan = compile_module(self, implementation)
+        return self.plan
 
     def execute(self, implementation, value=None):
+        "Returns the value of the last activity, streams materialized"
         self.log.debug("executing activities")
-        for a in self.activities:
-            a.module = self
-        for a in self.activities:
-            value = a.execute(implementation, value, self.execution_path)
-            self.log.debug("value form an activity %s" % str(value))
-        return value
+        plan = self.compile(implementation)
+        if implementation.workers:
+            return materialize(plan.execute_parallel(
+                value, implementation.workers, implementation.executor
+            ))
+        return materialize(plan.execute(value))
+
+    async def execute_async(self, implementation, value=None):
+        self.log.debug("executing activities asynchronously")
+        return materialize(
+            await self.compile(implementation).execute_async(value)
+        )
 
     def pretty_print(self):
         res = ""
@@ -41,52 +58,6 @@ class Activity:
         self.action = None
         self.subjects = []
         self.condition = None
-        self.module = None
-
-    def execute(self, implementation, value, execution_path=None):
-        self.log.debug("Executing %s" % self)
-        subjects = []
-        old_execution_path = path.abspath(path.dirname(__file__))
-        for i in range(len(self.subjects)):
-            if self.subjects[i].name in implementation.subjects:
-                chdir(execution_path)
-                subjects.append(
-                    implementation.subjects[self.subjects[i].name](
-                        " ".join(self.subjects[i].arguments),
-                    )
-                )
-                chdir(old_execution_path)
-            elif self.subjects[i].name in self.module.variables:
-                subjects += [self.module.variables[self.subjects[i].name]]
-            else:
-                raise NotImplementedError(
-                    "No subject {}".format(self.subjects[i].name)
-                )
-        if self.condition:
-            if self.condition.name not in implementation.conditions:
-                raise NotImplementedError(
-                    "No condition {}".format(self.condition.name)
-                )
-            condition_func = implementation.conditions[self.condition.name]
-            subjects = [condition_func(s) for s in subjects]
-        if len(subjects) == 0 and value:
-            subjects = value
-
-        if self.action.name not in implementation.actions:
-            if self.action.name in self.module.modules.keys():
-                return self.module.modules[self.action.name]. \
-                    execute(implementation, subjects)
-            raise NotImplementedError(
-                "No action {}".format(self.action.name)
-            )
-
-        if isinstance(self.action.arguments, list):
-            self.action.arguments = " ".join(self.action.arguments)
-        action_func = implementation.actions[self.action.name]
-        result = action_func(subjects, self.action.arguments)
-        if self.variable:
-            self.module.variables[self.variable] = result
-        return result
 
     def pretty_print(self):
         res = '''action: {}
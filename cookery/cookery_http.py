@@ -0,0 +1,130 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from email.utils import formatdate
+from os import path, makedirs, replace, getpid, stat
+from threading import Lock
+import logging
+
+log = logging.getLogger('Cookery')
+
+
+class HttpSession(object):
+    '''Protocol of HTTP subjects, one per Cookery instance.
+
+    Keeps a pool of keep-alive connections, revalidates downloaded
+    documents with ETag and Last-Modified instead of fetching them again,
+    and fetches several URLs concurrently on a bounded pool of threads.'''
+
+    # connections kept per host, and URLs fetched at the same time
+    connections = 10
+    workers = 8
+    chunk_size = 64 * 1024
+    timeout = 60
+    # documents kept for revalidation, least recently used are dropped
+    max_documents = 128
+
+    def __init__(self):
+        self._session = None
+        # url -> (ETag, Last-Modified, text)
+        self.documents = OrderedDict()
+        self.lock = Lock()
+
+    @property
+    def session(self):
+        # created on first use, requests is needed only by HTTP scripts
+        with self.lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.connections,
+                                      pool_maxsize=self.connections)
+                self._session.mount('http://', adapter)
+                self._session.mount('https://', adapter)
+            return self._session
+
+    def validators(self, url):
+        with self.lock:
+            document = self.documents.get(url)
+            if document is not None:
+                self.documents.move_to_end(url)
+        headers = {}
+        if document is not None:
+            etag, modified, _ = document
+            if etag:
+                headers['If-None-Match'] = etag
+            if modified:
+                headers['If-Modified-Since'] = modified
+        return document, headers
+
+    def get(self, url):
+        'Returns the text of url, revalidated if fetched before.'
+        document, headers = self.validators(url)
+        r = self.session.get(url, headers=headers, timeout=self.timeout)
+        if r.status_code == 304 and document is not None:
+            log.debug('not modified: {}'.format(url))
+            return document[2]
+        r.raise_for_status()
+        etag = r.headers.get('ETag')
+        modified = r.headers.get('Last-Modified')
+        if etag or modified:
+            with self.lock:
+                self.documents[url] = (etag, modified, r.text)
+                self.documents.move_to_end(url)
+                while len(self.documents) > self.max_documents:
+                    self.documents.popitem(last=False)
+        return r.text
+
+    def get_all(self, urls):
+        'Returns texts of urls, fetched concurrently.'
+        if len(urls) < 2:
+            return [self.get(url) for url in urls]
+        with ThreadPoolExecutor(min(self.workers, len(urls))) as pool:
+            futures = [pool.submit(copy_context().run, self.get, url)
+                       for url in urls]
+            return [future.result() for future in futures]
+
+    def lines(self, url):
+        'Yields lines of url as they arrive.'
+        with self.session.get(url, stream=True, timeout=self.timeout) as r:
+            r.raise_for_status()
+            if r.encoding is None:
+                r.encoding = 'utf-8'
+            previous = None
+            for line in r.iter_lines(self.chunk_size, decode_unicode=True,
+                                     delimiter='\n'):
+                if previous is not None:
+                    yield previous
+                previous = line
+            # a document ending with a new line has no empty last line
+            if previous:
+                yield previous
+
+    def download(self, url, file_name):
+        '''Streams url to file_name, unless the file is newer than the
+        document. Returns file_name.'''
+        headers = {}
+        if path.exists(file_name):
+            headers['If-Modified-Since'] = formatdate(
+                stat(file_name).st_mtime, usegmt=True)
+        with self.session.get(url, headers=headers, stream=True,
+                              timeout=self.timeout) as r:
+            if r.status_code == 304:
+                log.debug('not modified: {}'.format(url))
+                return file_name
+            r.raise_for_status()
+            directory = path.dirname(file_name)
+            if directory:
+                makedirs(directory, exist_ok=True)
+            temp_name = '{}.{}'.format(file_name, getpid())
+            with open(temp_name, 'wb') as f:
+                for chunk in r.iter_content(self.chunk_size):
+                    f.write(chunk)
+            replace(temp_name, file_name)
+        return file_name
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
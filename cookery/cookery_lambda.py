@@ -0,0 +1,144 @@
+from base64 import b64encode
+from functools import partial
+from io import BytesIO
+from os import path, walk, makedirs, replace, getpid, utime, stat
+from tempfile import TemporaryDirectory
+from zipfile import ZipFile, ZipInfo, ZIP_DEFLATED
+import hashlib
+import logging
+import shutil
+import subprocess
+import sys
+
+log = logging.getLogger('Cookery')
+
+# directory with setup.py of cookery, installed into every package
+COOKERY_PATH = path.dirname(path.dirname(path.abspath(__file__)))
+HANDLER_FILE = 'lambda'
+HANDLER_FUNCTION = 'lambda_handler'
+# timestamp of every entry, the earliest one a zip file can store
+EPOCH = (1980, 1, 1, 0, 0, 0)
+CHUNK = 1024 * 1024
+
+
+def handler_source(script):
+    return ("from cookery.cookery import Cookery\n\n\n"
+            "def {}(event, context):\n"
+            "    print('returned value:', Cookery().execute_file({!r}))\n"
+            "    return {{'message': \"it works!\"}}\n".format(
+                HANDLER_FUNCTION, script))
+
+
+def _mode(file_name):
+    return 0o755 if stat(file_name).st_mode & 0o111 else 0o644
+
+
+def _files(directory):
+    'Yields (relative name, file name) of files in directory, sorted.'
+    for root, dirs, files in walk(directory):
+        dirs[:] = sorted(d for d in dirs if d != '__pycache__')
+        for name in sorted(files):
+            file_name = path.join(root, name)
+            yield path.relpath(file_name, directory), file_name
+
+
+def runtime():
+    '''Returns the Lambda runtime of this interpreter, which installs the
+    dependencies of packages.'''
+    return 'python{}.{}'.format(*sys.version_info[:2])
+
+
+def dependencies_key(requirements=None):
+    '''Returns a hash of what the dependency layer is built from: the
+    interpreter, the source of cookery and the requirements.'''
+    digest = hashlib.sha256('{}.{} {}'.format(
+        *sys.version_info[:2], sys.platform).encode())
+    sources = [('setup.py', path.join(COOKERY_PATH, 'setup.py'))]
+    sources += [(path.join('cookery', name), file_name)
+                for name, file_name in _files(path.join(COOKERY_PATH,
+                                                        'cookery'))
+                if not name.endswith('.pyc')]
+    if requirements is not None:
+        sources.append(('requirements', requirements))
+    for name, file_name in sources:
+        if not path.exists(file_name):
+            continue
+        with open(file_name, 'rb') as f:
+            digest.update(name.encode() + b'\0' +
+                          hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def dependencies(cache_dir, requirements=None):
+    '''Returns a zip file of cookery and the requirements installed with
+    pip, built once per key and reused by following deployments.'''
+    file_name = path.join(cache_dir, dependencies_key(requirements) + '.zip')
+    if path.exists(file_name):
+        # kept by "cookery gc" as long as it is used
+        utime(file_name)
+        return file_name
+    makedirs(cache_dir, exist_ok=True)
+    temp_name = '{}.{}'.format(file_name, getpid())
+    with TemporaryDirectory(prefix='cookery-lambda-') as target:
+        command = [sys.executable, '-m', 'pip', 'install', '--quiet',
+                   '--no-compile', '--target', target, COOKERY_PATH]
+        if requirements is not None:
+            command += ['--requirement', requirements]
+        log.info('installing dependencies: {}'.format(' '.join(command)))
+        subprocess.run(command, check=True)
+        write_zip(temp_name, {
+            name: (_mode(f), partial(open, f, 'rb'))
+            for name, f in _files(target)
+        })
+    replace(temp_name, file_name)
+    return file_name
+
+
+def write_zip(file_name, entries):
+    '''Writes entries {name: (mode, open)} to a zip file, in order of
+    names and with fixed timestamps, so the same files give the same
+    bytes. Contents are copied in chunks, never held in memory whole.'''
+    with ZipFile(file_name, 'w', ZIP_DEFLATED) as zf:
+        for name in sorted(entries):
+            mode, open_entry = entries[name]
+            info = ZipInfo(name, EPOCH)
+            info.compress_type = ZIP_DEFLATED
+            # a regular file
+            info.external_attr = (0o100000 | mode) << 16
+            with open_entry() as source, \
+                    zf.open(info, 'w', force_zip64=True) as target:
+                shutil.copyfileobj(source, target, CHUNK)
+
+
+def package(file_name, name, cache_dir, requirements=None):
+    '''Writes the package of a script deployed as function name.
+
+    Returns its file name and its hash, in the form of CodeSha256 of the
+    Lambda API.'''
+    layer = dependencies(path.join(cache_dir, 'layers'), requirements)
+    script, _ = path.splitext(path.basename(file_name))
+    module, _ = path.splitext(file_name)
+    zip_name = path.join(cache_dir, 'packages', name + '.zip')
+    makedirs(path.dirname(zip_name), exist_ok=True)
+    temp_name = '{}.{}'.format(zip_name, getpid())
+    with ZipFile(layer) as zf:
+        entries = {info.filename: ((info.external_attr >> 16) & 0o777,
+                                   partial(zf.open, info))
+                   for info in zf.infolist()}
+        for f in [file_name, module + '.py', module + '.toml']:
+            if path.exists(f):
+                entries[path.basename(f)] = (_mode(f), partial(open, f, 'rb'))
+        entries[HANDLER_FILE + '.py'] = (
+            0o644, partial(BytesIO, handler_source(script).encode()))
+        write_zip(temp_name, entries)
+    replace(temp_name, zip_name)
+    return zip_name, code_sha256(zip_name)
+
+
+def code_sha256(file_name):
+    'Returns the base64 encoded SHA-256 of a file, like CodeSha256.'
+    digest = hashlib.sha256()
+    with open(file_name, 'rb') as f:
+        for chunk in iter(partial(f.read, CHUNK), b''):
+            digest.update(chunk)
+    return b64encode(digest.digest()).decode()
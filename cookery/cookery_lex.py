@@ -119,4 +119,6 @@ class CookeryLexer(object):
         t.lexer.lineno += t.value.count("\n")
 
     def t_ANY_error(self, t):
-        self.log.warning("Illegal character '%s'" % t.value[0])
+        # quiet lexers scan incomplete statements, see iter_statements
+        if not getattr(t.lexer, 'quiet', False):
+            self.log.warning("Illegal character '%s'" % t.value[0])
@@ -0,0 +1,11 @@
+# cookery_lextab.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('ACTION', 'ACTION_ARGUMENT', 'AND', 'AS', 'CONDITION', 'CONDITION_ARGUMENT', 'END', 'IF', 'IMPORT', 'JSON', 'MODULE', 'PATH', 'SUBJECT', 'SUBJECT_ARGUMENT', 'VARIABLE', 'WITH'))
+_lexreflags   = 64
+_lexliterals  = '='
+_lexstateinfo = {'INITIAL': 'inclusive', 'import': 'exclusive', 'importmodule': 'exclusive', 'subject': 'exclusive', 'subjectargument': 'exclusive', 'condition': 'exclusive', 'conditionargument': 'exclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_ANY_IMPORT>import)|(?P<t_INITIAL_VARIABLE>[A-Z][\\w_-]*(\\[\\])?)|(?P<t_INITIAL_ACTION>[a-z][\\w_-]*)|(?P<t_ANY_END>\\.)|(?P<t_ANY_newline>\\n+)|(?P<t_ANY_JSON>{[^}]+})|(?P<t_ANY_ignore_COMMENT>\\#.*)', [None, ('t_ANY_IMPORT', 'IMPORT'), ('t_INITIAL_VARIABLE', 'VARIABLE'), None, ('t_INITIAL_ACTION', 'ACTION'), ('t_ANY_END', 'END'), ('t_ANY_newline', 'newline'), (None, 'JSON'), (None, None)])], 'import': [('(?P<t_ANY_IMPORT>import)|(?P<t_import_PATH>(\\\'[\\w\\/_\\.-]+\\\')|(\\"[\\w\\/_\\.-]+\\")|([\\w\\/_\\.-]+))|(?P<t_ANY_END>\\.)|(?P<t_ANY_newline>\\n+)|(?P<t_ANY_JSON>{[^}]+})|(?P<t_ANY_ignore_COMMENT>\\#.*)', [None, ('t_ANY_IMPORT', 'IMPORT'), ('t_import_PATH', 'PATH'), None, None, None, ('t_ANY_END', 'END'), ('t_ANY_newline', 'newline'), (None, 'JSON'), (None, None)])], 'importmodule': [('(?P<t_ANY_IMPORT>import)|(?P<t_importmodule_MODULE>\\w+)|(?P<t_ANY_END>\\.)|(?P<t_ANY_newline>\\n+)|(?P<t_ANY_JSON>{[^}]+})|(?P<t_ANY_ignore_COMMENT>\\#.*)', [None, ('t_ANY_IMPORT', 'IMPORT'), ('t_importmodule_MODULE', 'MODULE'), ('t_ANY_END', 'END'), ('t_ANY_newline', 'newline'), (None, 'JSON'), (None, None)])], 'subject': [('(?P<t_ANY_IMPORT>import)|(?P<t_subject_ACTION_ARGUMENT>[^A-Z{\\.](:?(?!(:?\\.\\s)|(:?\\.\\Z))[^ ])*)|(?P<t_subject_SUBJECT>[A-Z][\\w_-]*(\\[\\])?)|(?P<t_ANY_END>\\.)|(?P<t_ANY_newline>\\n+)|(?P<t_ANY_JSON>{[^}]+})|(?P<t_ANY_ignore_COMMENT>\\#.*)', [None, ('t_ANY_IMPORT', 'IMPORT'), ('t_subject_ACTION_ARGUMENT', 'ACTION_ARGUMENT'), None, None, None, ('t_subject_SUBJECT', 'SUBJECT'), None, ('t_ANY_END', 'END'), ('t_ANY_newline', 'newline'), (None, 'JSON'), (None, None)])], 'subjectargument': [('(?P<t_ANY_IMPORT>import)|(?P<t_subjectargument_SUBJECT_ARGUMENT>(:?(?!(:?\\.\\s)|(:?\\.\\Z))[^ {])+)|(?P<t_ANY_END>\\.)|(?P<t_ANY_newline>\\n+)|(?P<t_ANY_JSON>{[^}]+})|(?P<t_ANY_ignore_COMMENT>\\#.*)', [None, ('t_ANY_IMPORT', 'IMPORT'), ('t_subjectargument_SUBJECT_ARGUMENT', 'SUBJECT_ARGUMENT'), None, None, None, ('t_ANY_END', 'END'), ('t_ANY_newline', 'newline'), (None, 'JSON'), (None, None)])], 'condition': [('(?P<t_ANY_IMPORT>import)|(?P<t_condition_CONDITION>[a-z][\\w_-]*)|(?P<t_ANY_END>\\.)|(?P<t_ANY_newline>\\n+)|(?P<t_ANY_JSON>{[^}]+})|(?P<t_ANY_ignore_COMMENT>\\#.*)', [None, ('t_ANY_IMPORT', 'IMPORT'), ('t_condition_CONDITION', 'CONDITION'), ('t_ANY_END', 'END'), ('t_ANY_newline', 'newline'), (None, 'JSON'), (None, None)])], 'conditionargument': [('(?P<t_ANY_IMPORT>import)|(?P<t_conditionargument_CONDITION_ARGUMENT>(:?(?!(:?\\.\\s)|(:?\\.\\Z))[^ {])+)|(?P<t_ANY_END>\\.)|(?P<t_ANY_newline>\\n+)|(?P<t_ANY_JSON>{[^}]+})|(?P<t_ANY_ignore_COMMENT>\\#.*)', [None, ('t_ANY_IMPORT', 'IMPORT'), ('t_conditionargument_CONDITION_ARGUMENT', 'CONDITION_ARGUMENT'), None, None, None, ('t_ANY_END', 'END'), ('t_ANY_newline', 'newline'), (None, 'JSON'), (None, None)])]}
+_lexstateignore = {'INITIAL': ' \t', 'import': ' \t', 'importmodule': ' \t', 'subject': ' \t', 'subjectargument': ' \t', 'condition': ' \t', 'conditionargument': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_ANY_error', 'import': 't_ANY_error', 'importmodule': 't_ANY_error', 'subject': 't_ANY_error', 'subjectargument': 't_ANY_error', 'condition': 't_ANY_error', 'conditionargument': 't_ANY_error'}
+_lexstateeoff = {}
+_cookery_signature = 'c8e88d346a207b94f01ad7c5e5672d721c21744a46e8e29998f1b29ac8f2e10a'
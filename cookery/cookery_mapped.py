@@ -0,0 +1,72 @@
+from os import path
+import mmap
+
+# files larger than this are mapped by the stdlib File subject
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+class MappedFile(object):
+    '''Read-only memory map of a file.
+
+    Slicing returns memoryviews of the mapping, nothing is copied until an
+    action asks for bytes or text. The view attribute supports the buffer
+    protocol, e.g. numpy.frombuffer(mapped.view, dtype).'''
+
+    def __init__(self, file_name, encoding='utf-8'):
+        self.file_name = path.abspath(file_name)
+        self.encoding = encoding
+        with open(self.file_name, 'rb') as f:
+            if path.getsize(self.file_name) == 0:
+                # empty files cannot be mapped
+                self.map = None
+                self.view = memoryview(b'')
+            else:
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self.view = memoryview(self.map)
+
+    def __len__(self):
+        return len(self.view)
+
+    def __getitem__(self, key):
+        return self.view[key]
+
+    def find(self, sub, start=0, end=None):
+        if self.map is None:
+            return -1
+        return self.map.find(sub, start, len(self) if end is None else end)
+
+    def lines(self):
+        'Yields decoded lines, one at a time.'
+        start = 0
+        while start < len(self):
+            end = self.find(b'\n', start)
+            end = len(self) if end == -1 else end + 1
+            yield bytes(self.view[start:end]).decode(self.encoding)
+            start = end
+
+    def bytes(self):
+        return bytes(self.view)
+
+    def text(self):
+        return str(self.view, self.encoding)
+
+    def __str__(self):
+        return self.text()
+
+    def __repr__(self):
+        return 'MappedFile({!r})'.format(self.file_name)
+
+    def close(self):
+        self.view.release()
+        if self.map is not None:
+            self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __reduce__(self):
+        # process pools receive the path and map the file again
+        return (MappedFile, (self.file_name, self.encoding))
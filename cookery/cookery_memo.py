@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from os import stat
+from threading import Lock
+from time import monotonic
+import inspect
+import logging
+from .cookery_stream import Stream
+from .cookery_context import resolve_path
+
+log = logging.getLogger('Cookery')
+
+
+def mtime(file_name, *args):
+    'Validator of file subjects, changes when the file is modified.'
+    try:
+        s = stat(resolve_path(file_name))
+    except OSError:
+        return None
+    return (s.st_mtime_ns, s.st_size)
+
+
+def _reopen(value):
+    reopen = getattr(value, 'reopen', None)
+    return value if reopen is None else reopen()
+
+
+class SubjectCache(object):
+    '''Size bounded LRU cache of subject values.
+
+    Entries expire after the TTL of their subject and are dropped when the
+    validator of the subject returns a different token than when they were
+    stored (e.g. the file was modified). Streams that can be opened again
+    (FileStream) are cached, every hit gets a new pass over them.'''
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, load, args=(), ttl=None, validate=None):
+        'Returns a cached value of key, calls load(*args) on a miss.'
+        token = validate(*args) if validate is not None else None
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires, stored = entry
+                if (expires is None or monotonic() < expires) and \
+                   stored == token:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return _reopen(value)
+                del self.entries[key]
+            self.misses += 1
+
+        value = load(*args)
+        if isinstance(value, Stream) and not hasattr(value, 'reopen') or \
+           inspect.isawaitable(value):
+            # single-pass, cannot be served twice
+            log.debug('value of {} not cached: {!r}'.format(key[0], value))
+            return value
+
+        with self.lock:
+            self.entries[key] = (
+                value, None if ttl is None else monotonic() + ttl, token
+            )
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return 'SubjectCache(hits={}, misses={}, size={}/{})'.format(
+            self.hits, self.misses, len(self), self.maxsize)
@@ -15,19 +15,23 @@ class CookeryParser(object):
                  | activities'''
         p[0] = Module(None, p[1]) if len(p) < 3 else Module(p[1], p[2])
 
-    def p_imports(self, p):
-        '''imports : IMPORT PATH AS MODULE
-                   | IMPORT PATH AS MODULE imports'''
+    def p_imports_1(self, p):
+        'imports : IMPORT PATH AS MODULE'
         p[0] = [{'import': p[2], 'as': p[4]}]
-        if len(p) > 5:
-            p[0] += p[5]
 
-    def p_activities(self, p):
-        '''activities : activity
-                      | activity activities'''
+    def p_imports_2(self, p):
+        'imports : imports IMPORT PATH AS MODULE'
+        p[0] = p[1]
+        p[0].append({'import': p[3], 'as': p[5]})
+
+    def p_activities_1(self, p):
+        'activities : activity'
         p[0] = [p[1]]
-        if len(p) > 2:
-            p[0] += p[2]
+
+    def p_activities_2(self, p):
+        'activities : activities activity'
+        p[0] = p[1]
+        p[0].append(p[2])
 
     def p_activity_1(self, p):
         'activity : action END'
@@ -90,42 +94,61 @@ class CookeryParser(object):
         p[0] = self._load_json(p[1])
 
     def p_action_arguments_2(self, p):
-        'action_arguments : ACTION_ARGUMENT'
-        p[0] = [p[1]]
+        'action_arguments : action_argument_list'
+        p[0] = p[1]
 
     def p_action_arguments_3(self, p):
-        'action_arguments : ACTION_ARGUMENT action_arguments'
-        p[0] = [p[1]] + p[2]
+        'action_arguments : action_argument_list JSON'
+        p[0] = p[1]
+        p[0].append(self._load_json(p[2]))
+
+    def p_action_argument_list_1(self, p):
+        'action_argument_list : ACTION_ARGUMENT'
+        p[0] = [p[1]]
+
+    def p_action_argument_list_2(self, p):
+        'action_argument_list : action_argument_list ACTION_ARGUMENT'
+        p[0] = p[1]
+        p[0].append(p[2])
 
     def p_subject_1(self, p):
-        'subject : SUBJECT'
-        p[0] = [Subject(p[1])]
+        'subject : subject_item'
+        p[0] = [p[1]]
 
     def p_subject_2(self, p):
-        'subject : SUBJECT subject_arguments'
-        p[0] = [Subject(p[1], p[2])]
+        'subject : subject AND subject_item'
+        p[0] = p[1]
+        p[0].append(p[3])
 
-    def p_subject_3(self, p):
-        'subject : SUBJECT AND subject'
-        p[0] = [Subject(p[1])]
-        p[0] += p[3]
+    def p_subject_item_1(self, p):
+        'subject_item : SUBJECT'
+        p[0] = Subject(p[1])
 
-    def p_subject_4(self, p):
-        'subject : SUBJECT subject_arguments AND subject'
-        p[0] = [Subject(p[1], p[2])]
-        p[0].append(p[4])
+    def p_subject_item_2(self, p):
+        'subject_item : SUBJECT subject_arguments'
+        p[0] = Subject(p[1], p[2])
 
     def p_subject_arguments_1(self, p):
         'subject_arguments : JSON'
         p[0] = self._load_json(p[1])
 
     def p_subject_arguments_2(self, p):
-        'subject_arguments : SUBJECT_ARGUMENT'
-        p[0] = [p[1]]
+        'subject_arguments : subject_argument_list'
+        p[0] = p[1]
 
     def p_subject_arguments_3(self, p):
-        'subject_arguments : SUBJECT_ARGUMENT subject_arguments'
-        p[0] = [p[1]] + p[2]
+        'subject_arguments : subject_argument_list JSON'
+        p[0] = p[1]
+        p[0].append(self._load_json(p[2]))
+
+    def p_subject_argument_list_1(self, p):
+        'subject_argument_list : SUBJECT_ARGUMENT'
+        p[0] = [p[1]]
+
+    def p_subject_argument_list_2(self, p):
+        'subject_argument_list : subject_argument_list SUBJECT_ARGUMENT'
+        p[0] = p[1]
+        p[0].append(p[2])
 
     def p_condition_1(self, p):
         'condition : CONDITION'
@@ -140,12 +163,22 @@ class CookeryParser(object):
         p[0] = self._load_json(p[1])
 
     def p_condition_arguments_2(self, p):
-        'condition_arguments : CONDITION_ARGUMENT'
-        p[0] = [p[1]]
+        'condition_arguments : condition_argument_list'
+        p[0] = p[1]
 
     def p_condition_arguments_3(self, p):
-        'condition_arguments : CONDITION_ARGUMENT condition_arguments'
-        p[0] = [p[1]] + p[2]
+        'condition_arguments : condition_argument_list JSON'
+        p[0] = p[1]
+        p[0].append(self._load_json(p[2]))
+
+    def p_condition_argument_list_1(self, p):
+        'condition_argument_list : CONDITION_ARGUMENT'
+        p[0] = [p[1]]
+
+    def p_condition_argument_list_2(self, p):
+        'condition_argument_list : condition_argument_list CONDITION_ARGUMENT'
+        p[0] = p[1]
+        p[0].append(p[2])
 
     def p_error(self, p):
         if p:
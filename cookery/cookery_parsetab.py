@@ -0,0 +1,70 @@
+
+# cookery_parsetab.py
+# This file is automatically generated. Do not edit.
+# pylint: disable=W,C,R
+_tabversion = '3.10'
+
+_lr_method = 'LALR'
+
+_lr_signature = 'ACTION ACTION_ARGUMENT AND AS CONDITION CONDITION_ARGUMENT END IF IMPORT JSON MODULE PATH SUBJECT SUBJECT_ARGUMENT VARIABLE WITHinput : imports activities\n                 | activitiesimports : IMPORT PATH AS MODULEimports : imports IMPORT PATH AS MODULEactivities : activityactivities : activities activityactivity : action ENDactivity : action subject ENDactivity : action IF condition END\n                    | action WITH condition ENDactivity : action subject IF condition END\n                    | action subject WITH condition ENDactivity : VARIABLE "=" action ENDactivity : VARIABLE "=" action subject ENDactivity : VARIABLE "=" action subject IF condition END\n                    | VARIABLE "=" action subject WITH condition ENDaction : ACTIONaction : ACTION action_argumentsaction_arguments : JSONaction_arguments : action_argument_listaction_arguments : action_argument_list JSONaction_argument_list : ACTION_ARGUMENTaction_argument_list : action_argument_list ACTION_ARGUMENTsubject : subject_itemsubject : subject AND subject_itemsubject_item : SUBJECTsubject_item : SUBJECT subject_argumentssubject_arguments : JSONsubject_arguments : subject_argument_listsubject_arguments : subject_argument_list JSONsubject_argument_list : SUBJECT_ARGUMENTsubject_argument_list : subject_argument_list SUBJECT_ARGUMENTcondition : CONDITIONcondition : CONDITION condition_argumentscondition_arguments : JSONcondition_arguments : condition_argument_listcondition_arguments : condition_argument_list JSONcondition_argument_list : CONDITION_ARGUMENTcondition_argument_list : condition_argument_list CONDITION_ARGUMENT'
+    
+_lr_action_items = {'IMPORT':([0,2,41,55,],[4,10,-3,-4,]),'VARIABLE':([0,2,3,5,9,11,13,26,41,45,50,53,55,56,57,60,65,66,],[7,7,7,-5,7,-6,-7,-8,-3,-9,-10,-13,-4,-11,-12,-14,-15,-16,]),'ACTION':([0,2,3,5,9,11,13,19,26,41,45,50,53,55,56,57,60,65,66,],[8,8,8,-5,8,-6,-7,8,-8,-3,-9,-10,-13,-4,-11,-12,-14,-15,-16,]),'$end':([1,3,5,9,11,13,26,45,50,53,56,57,60,65,66,],[0,-2,-5,-1,-6,-7,-8,-9,-10,-13,-11,-12,-14,-15,-16,]),'PATH':([4,10,],[12,24,]),'END':([6,8,14,17,18,20,21,22,23,30,31,32,33,34,35,36,37,38,39,42,43,44,46,47,48,49,51,52,54,58,59,63,64,],[13,-17,26,-24,-26,-18,-19,-20,-22,45,-33,50,-27,-28,-29,-31,53,-21,-23,56,57,-25,-34,-35,-36,-38,-30,-32,60,-37,-39,65,66,]),'IF':([6,8,14,17,18,20,21,22,23,33,34,35,36,38,39,44,51,52,54,],[15,-17,27,-24,-26,-18,-19,-20,-22,-27,-28,-29,-31,-21,-23,-25,-30,-32,61,]),'WITH':([6,8,14,17,18,20,21,22,23,33,34,35,36,38,39,44,51,52,54,],[16,-17,28,-24,-26,-18,-19,-20,-22,-27,-28,-29,-31,-21,-23,-25,-30,-32,62,]),'SUBJECT':([6,8,20,21,22,23,29,37,38,39,],[18,-17,-18,-19,-20,-22,18,18,-21,-23,]),'=':([7,],[19,]),'JSON':([8,18,22,23,31,35,36,39,48,49,52,59,],[21,34,38,-22,47,51,-31,-23,58,-38,-32,-39,]),'ACTION_ARGUMENT':([8,22,23,39,],[23,39,-22,-23,]),'AS':([12,24,],[25,40,]),'AND':([14,17,18,33,34,35,36,44,51,52,54,],[29,-24,-26,-27,-28,-29,-31,-25,-30,-32,29,]),'CONDITION':([15,16,27,28,61,62,],[31,31,31,31,31,31,]),'SUBJECT_ARGUMENT':([18,35,36,52,],[36,52,-31,-32,]),'MODULE':([25,40,],[41,55,]),'CONDITION_ARGUMENT':([31,48,49,59,],[49,59,-38,-39,]),}
+
+_lr_action = {}
+for _k, _v in _lr_action_items.items():
+   for _x,_y in zip(_v[0],_v[1]):
+      if not _x in _lr_action:  _lr_action[_x] = {}
+      _lr_action[_x][_k] = _y
+del _lr_action_items
+
+_lr_goto_items = {'input':([0,],[1,]),'imports':([0,],[2,]),'activities':([0,2,],[3,9,]),'activity':([0,2,3,9,],[5,5,11,11,]),'action':([0,2,3,9,19,],[6,6,6,6,37,]),'subject':([6,37,],[14,54,]),'subject_item':([6,29,37,],[17,44,17,]),'action_arguments':([8,],[20,]),'action_argument_list':([8,],[22,]),'condition':([15,16,27,28,61,62,],[30,32,42,43,63,64,]),'subject_arguments':([18,],[33,]),'subject_argument_list':([18,],[35,]),'condition_arguments':([31,],[46,]),'condition_argument_list':([31,],[48,]),}
+
+_lr_goto = {}
+for _k, _v in _lr_goto_items.items():
+   for _x, _y in zip(_v[0], _v[1]):
+       if not _x in _lr_goto: _lr_goto[_x] = {}
+       _lr_goto[_x][_k] = _y
+del _lr_goto_items
+_lr_productions = [
+  ("S' -> input","S'",1,None,None,None),
+  ('input -> imports activities','input',2,'p_input','cookery_parse.py',14),
+  ('input -> activities','input',1,'p_input','cookery_parse.py',15),
+  ('imports -> IMPORT PATH AS MODULE','imports',4,'p_imports_1','cookery_parse.py',19),
+  ('imports -> imports IMPORT PATH AS MODULE','imports',5,'p_imports_2','cookery_parse.py',23),
+  ('activities -> activity','activities',1,'p_activities_1','cookery_parse.py',28),
+  ('activities -> activities activity','activities',2,'p_activities_2','cookery_parse.py',32),
+  ('activity -> action END','activity',2,'p_activity_1','cookery_parse.py',37),
+  ('activity -> action subject END','activity',3,'p_activity_2','cookery_parse.py',42),
+  ('activity -> action IF condition END','activity',4,'p_activity_3','cookery_parse.py',48),
+  ('activity -> action WITH condition END','activity',4,'p_activity_3','cookery_parse.py',49),
+  ('activity -> action subject IF condition END','activity',5,'p_activity_4','cookery_parse.py',55),
+  ('activity -> action subject WITH condition END','activity',5,'p_activity_4','cookery_parse.py',56),
+  ('activity -> VARIABLE = action END','activity',4,'p_activity_5','cookery_parse.py',63),
+  ('activity -> VARIABLE = action subject END','activity',5,'p_activity_6','cookery_parse.py',69),
+  ('activity -> VARIABLE = action subject IF condition END','activity',7,'p_activity_7','cookery_parse.py',76),
+  ('activity -> VARIABLE = action subject WITH condition END','activity',7,'p_activity_7','cookery_parse.py',77),
+  ('action -> ACTION','action',1,'p_action_1','cookery_parse.py',85),
+  ('action -> ACTION action_arguments','action',2,'p_action_2','cookery_parse.py',89),
+  ('action_arguments -> JSON','action_arguments',1,'p_action_arguments_1','cookery_parse.py',93),
+  ('action_arguments -> action_argument_list','action_arguments',1,'p_action_arguments_2','cookery_parse.py',97),
+  ('action_arguments -> action_argument_list JSON','action_arguments',2,'p_action_arguments_3','cookery_parse.py',101),
+  ('action_argument_list -> ACTION_ARGUMENT','action_argument_list',1,'p_action_argument_list_1','cookery_parse.py',106),
+  ('action_argument_list -> action_argument_list ACTION_ARGUMENT','action_argument_list',2,'p_action_argument_list_2','cookery_parse.py',110),
+  ('subject -> subject_item','subject',1,'p_subject_1','cookery_parse.py',115),
+  ('subject -> subject AND subject_item','subject',3,'p_subject_2','cookery_parse.py',119),
+  ('subject_item -> SUBJECT','subject_item',1,'p_subject_item_1','cookery_parse.py',124),
+  ('subject_item -> SUBJECT subject_arguments','subject_item',2,'p_subject_item_2','cookery_parse.py',128),
+  ('subject_arguments -> JSON','subject_arguments',1,'p_subject_arguments_1','cookery_parse.py',132),
+  ('subject_arguments -> subject_argument_list','subject_arguments',1,'p_subject_arguments_2','cookery_parse.py',136),
+  ('subject_arguments -> subject_argument_list JSON','subject_arguments',2,'p_subject_arguments_3','cookery_parse.py',140),
+  ('subject_argument_list -> SUBJECT_ARGUMENT','subject_argument_list',1,'p_subject_argument_list_1','cookery_parse.py',145),
+  ('subject_argument_list -> subject_argument_list SUBJECT_ARGUMENT','subject_argument_list',2,'p_subject_argument_list_2','cookery_parse.py',149),
+  ('condition -> CONDITION','condition',1,'p_condition_1','cookery_parse.py',154),
+  ('condition -> CONDITION condition_arguments','condition',2,'p_condition_2','cookery_parse.py',158),
+  ('condition_arguments -> JSON','condition_arguments',1,'p_condition_arguments_1','cookery_parse.py',162),
+  ('condition_arguments -> condition_argument_list','condition_arguments',1,'p_condition_arguments_2','cookery_parse.py',166),
+  ('condition_arguments -> condition_argument_list JSON','condition_arguments',2,'p_condition_arguments_3','cookery_parse.py',170),
+  ('condition_argument_list -> CONDITION_ARGUMENT','condition_argument_list',1,'p_condition_argument_list_1','cookery_parse.py',175),
+  ('condition_argument_list -> condition_argument_list CONDITION_ARGUMENT','condition_argument_list',2,'p_condition_argument_list_2','cookery_parse.py',179),
+]
+_cookery_signature = 'c8e88d346a207b94f01ad7c5e5672d721c21744a46e8e29998f1b29ac8f2e10a'
@@ -0,0 +1,552 @@
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, \
+    wait, FIRST_COMPLETED
+from multiprocessing import get_context
+from collections import defaultdict
+from functools import partial
+from contextvars import copy_context
+import asyncio
+import inspect
+import logging
+from .cookery_context import executing, execution_path
+from .exceptions import CookerySubjectErrors
+
+log = logging.getLogger('Cookery Plan')
+
+# plans and steps executed on process pools, workers are forked with them
+_plans = {}
+_steps = {}
+
+
+def _join(arguments):
+    if isinstance(arguments, list):
+        return " ".join(arguments)
+    return arguments
+
+
+def _missing(kind, name):
+    def missing(*args):
+        raise NotImplementedError("No {} {}".format(kind, name))
+    return missing
+
+
+def _execute_module(module, implementation, subjects):
+    return module.compile(implementation).execute(subjects)
+
+
+def _call_step(plan, index, value, variables):
+    return _plans[plan].steps[index].call(value, variables)
+
+
+def _map_item(step, subjects):
+    step = _steps[step]
+    with executing(step.execution_path):
+        return _wait(step.action(subjects))
+
+
+def _is_async(func):
+    while isinstance(func, partial):
+        func = func.func
+    return inspect.iscoroutinefunction(inspect.unwrap(func))
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def _wait(value):
+    'Runs an awaitable returned by an async implementation to completion.'
+    if not inspect.isawaitable(value):
+        return value
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_await(value))
+    # called from a running loop (e.g. Jupyter), cannot block it
+    with ThreadPoolExecutor(1) as pool:
+        return pool.submit(copy_context().run,
+                           asyncio.run, _await(value)).result()
+
+
+def _raise(errors):
+    'Raises the error of a subject, or all of them if several failed.'
+    if len(errors) == 1:
+        raise errors[0][1]
+    raise CookerySubjectErrors(errors)
+
+
+def _collect(subjects, results):
+    'Returns values of subjects, raises after all of them are loaded.'
+    errors = [(name, error)
+              for (name, _), (_, error) in zip(subjects, results)
+              if error is not None]
+    if errors:
+        _raise(errors)
+    return [value for value, _ in results]
+
+
+def _awaited(func):
+    'Returns func running the awaitable it returns to completion.'
+    def call(*args):
+        return _wait(func(*args))
+    return call
+
+
+async def _call_async(func, *args):
+    'Awaits async implementations, runs sync ones in an executor.'
+    if _is_async(func):
+        return await func(*args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, partial(copy_context().run, func, *args))
+
+
+class Step(object):
+    '''Activity with its subjects, condition and action looked up.
+
+    Subjects are either bound subject implementations or names of
+    variables, which are only known when the step runs.'''
+
+    __slots__ = ('activity', 'variable', 'subjects', 'loads', 'reads',
+                 'condition', 'action', 'execution_path', 'pool',
+                 'mapped', 'map_variable', 'mapping', 'cached', 'sources',
+                 'call')
+
+    def __init__(self, activity, variable, subjects, condition, action,
+                 execution_path=None, pool=None,
+                 mapped=(), map_variable=False, mapping=(None, 'process'),
+                 cached=None):
+        self.activity = activity
+        self.variable = variable
+        self.subjects = subjects
+        self.loads = sum(loader is not None for _, loader in subjects)
+        self.reads = [name for name, loader in subjects if loader is None]
+        self.condition = condition
+        self.action = action
+        self.execution_path = execution_path
+        # returns a pool loading several subjects concurrently, or None
+        self.pool = pool
+        # positions of T[] subjects, the action is applied to their elements
+        self.mapped = mapped
+        # T[] = action, the action is applied to every subject
+        self.map_variable = map_variable
+        # workers and executor (thread or process) of mapped actions
+        self.mapping = mapping
+        # result cache and the key prefix of the action, or None
+        self.cached = cached
+        # (name, loader, whether it is async) of subjects
+        self.sources = [(name, loader,
+                         loader is not None and _is_async(loader))
+                        for name, loader in subjects]
+        # call(value, variables) returning the result of the step
+        self.call = self.specialise()
+
+    def load(self, variables):
+        pool = self.pool() if self.loads > 1 and self.pool else None
+        if pool is None:
+            return self.load_plain(variables)
+        futures = [pool.submit(copy_context().run,
+                               self.load_subject, s, variables)
+                   for s in self.subjects]
+        results = []
+        for future in futures:
+            error = future.exception()
+            results.append((None if error else future.result(), error))
+        return _collect(self.subjects, results)
+
+    def load_plain(self, variables):
+        'Loads subjects one after another, raises after all of them.'
+        values = []
+        errors = []
+        for name, loader, awaited in self.sources:
+            try:
+                if loader is not None:
+                    value = loader()
+                    values.append(_wait(value) if awaited else value)
+                elif name in variables:
+                    values.append(variables[name])
+                else:
+                    raise NotImplementedError("No subject {}".format(name))
+            except Exception as e:
+                errors.append((name, e))
+        if errors:
+            _raise(errors)
+        return values
+
+    async def load_async(self, variables):
+        values = await asyncio.gather(*[
+            self.load_subject_async(s, variables) for s in self.subjects
+        ], return_exceptions=True)
+        return _collect(self.subjects, [
+            (None, v) if isinstance(v, Exception) else (v, None)
+            for v in values
+        ])
+
+    @staticmethod
+    def load_subject(subject, variables):
+        name, loader = subject
+        if loader is not None:
+            return _wait(loader())
+        try:
+            return variables[name]
+        except KeyError:
+            raise NotImplementedError("No subject {}".format(name))
+
+    @staticmethod
+    async def load_subject_async(subject, variables):
+        name, loader = subject
+        if loader is not None:
+            return await _call_async(loader)
+        return Step.load_subject(subject, variables)
+
+    @property
+    def chained(self):
+        'Steps without subjects receive the value of the previous step.'
+        return not self.subjects
+
+    def items(self, subjects):
+        '''Returns subjects of every call of a mapped action, or None.
+
+        T[] subjects are iterated together, the others are passed as they
+        are. T[] = action maps all subjects, or elements of the value.'''
+        mapped = self.mapped
+        if not mapped and self.map_variable:
+            if not self.subjects:
+                return [[s] for s in subjects]
+            mapped = range(len(subjects))
+        if not mapped:
+            return None
+        items = []
+        for row in zip(*[subjects[k] for k in mapped]):
+            item = list(subjects)
+            for k, element in zip(mapped, row):
+                item[k] = element
+            items.append(item)
+        return items
+
+    def apply(self, item):
+        return _wait(self.action(item))
+
+    def map(self, items):
+        'Calls the action for every item, gathers results in a list.'
+        workers, executor = self.mapping
+        if not workers or len(items) < 2:
+            return [self.apply(item) for item in items]
+        if executor == 'thread':
+            with ThreadPoolExecutor(workers) as pool:
+                futures = [pool.submit(copy_context().run, self.apply, item)
+                           for item in items]
+                return [future.result() for future in futures]
+        _steps[id(self)] = self
+        try:
+            with ProcessPoolExecutor(workers,
+                                     mp_context=get_context('fork')) as pool:
+                return list(pool.map(partial(_map_item, id(self)), items,
+                                     chunksize=max(1, len(items) //
+                                                   (workers * 4))))
+        finally:
+            _steps.pop(id(self), None)
+
+    def lookup(self, subjects):
+        'Returns (key, found, result) of the result cache.'
+        if self.cached is None:
+            return None, False, None
+        cache, prefix = self.cached
+        key = cache.key(prefix, subjects)
+        if key is None:
+            return None, False, None
+        found, result = cache.load(key, self.execution_path)
+        if found:
+            log.debug('{} skipped, result loaded from cache'.format(
+                self.activity))
+        return key, found, result
+
+    def remember(self, key, result):
+        if key is not None:
+            self.cached[0].store(key, result, self.execution_path)
+        return result
+
+    def specialise(self):
+        '''Returns call(value, variables) doing only what the step needs.
+
+        The context is entered only with an execution path, the result
+        cache is looked up only for cached actions, subjects are mapped
+        only with T[] and implementations awaited only if they are async.
+        Subjects are loaded in a plain loop unless a pool can load them.'''
+        if self.loads > 1 and self.pool:
+            load = self.load
+        else:
+            load = self.load_plain
+        condition = self.condition
+        if condition is not None and _is_async(condition):
+            condition = _awaited(condition)
+        if self.mapped or self.map_variable:
+            def act(subjects):
+                return self.map(self.items(subjects))
+        elif _is_async(self.action):
+            act = _awaited(self.action)
+        else:
+            act = self.action
+
+        if self.cached is not None:
+            uncached = act
+
+            def act(subjects):
+                key, found, result = self.lookup(subjects)
+                if found:
+                    return result
+                return self.remember(key, uncached(subjects))
+
+        if not self.subjects:
+            def call(value, variables):
+                return act(value or [])
+        elif condition is None:
+            def call(value, variables):
+                subjects = load(variables)
+                if not subjects and value:
+                    subjects = value
+                return act(subjects)
+        else:
+            def call(value, variables):
+                subjects = [condition(s) for s in load(variables)]
+                if not subjects and value:
+                    subjects = value
+                return act(subjects)
+
+        directory = self.execution_path
+        if directory is None:
+            return call
+        in_context = call
+
+        def call(value, variables):
+            token = execution_path.set(directory)
+            try:
+                return in_context(value, variables)
+            finally:
+                execution_path.reset(token)
+        return call
+
+    async def call_async(self, value, variables):
+        with executing(self.execution_path):
+            return await self.call_in_context_async(value, variables)
+
+    async def call_in_context_async(self, value, variables):
+        subjects = await self.load_async(variables)
+        if self.condition is not None:
+            subjects = await asyncio.gather(*[
+                _call_async(self.condition, s) for s in subjects
+            ])
+        if len(subjects) == 0 and value:
+            subjects = value
+        key, found, result = self.lookup(subjects)
+        if found:
+            return result
+        items = self.items(subjects)
+        if items is None:
+            result = await _call_async(self.action, subjects)
+        elif _is_async(self.action):
+            result = list(await asyncio.gather(*[
+                self.action(item) for item in items
+            ]))
+        else:
+            result = await _call_async(self.map, items)
+        return self.remember(key, result)
+
+
+class Plan(object):
+    'Steps of a module, executed in order.'
+
+    def __init__(self, module, implementation, steps):
+        self.module = module
+        self.implementation = implementation
+        self.activities = module.activities
+        self.steps = steps
+
+    def execute(self, value=None):
+        variables = self.module.variables
+        debug = log.isEnabledFor(logging.DEBUG)
+        for step in self.steps:
+            value = step.call(value, variables)
+            if step.variable:
+                variables[step.variable] = value
+            if debug:
+                log.debug("value from {}: {}".format(step.activity, value))
+        return value
+
+    def dependencies(self):
+        '''Returns a set of steps every step has to wait for.
+
+        A step waits for the last assignment of variables it reads, for
+        the previous step if it takes its value, and before assigning a
+        variable, for the previous assignment and for steps reading it.'''
+        writers = {}
+        readers = defaultdict(list)
+        dependencies = []
+        for i, step in enumerate(self.steps):
+            waits = set()
+            if step.chained and i > 0:
+                waits.add(i - 1)
+            for name in step.reads:
+                if name in writers:
+                    waits.add(writers[name])
+                readers[name].append(i)
+            if step.variable:
+                if step.variable in writers:
+                    waits.add(writers[step.variable])
+                waits.update(readers.pop(step.variable, []))
+                writers[step.variable] = i
+            waits.discard(i)
+            dependencies.append(waits)
+        return dependencies
+
+    def execute_parallel(self, value=None, workers=None, executor='thread'):
+        '''Executes independent steps concurrently on a pool of workers.
+
+        Results are the same as of a sequential execution. With a process
+        pool, subjects and results have to be picklable.'''
+        if not self.steps:
+            return value
+        variables = self.module.variables
+        waiting = [set(d) for d in self.dependencies()]
+        dependants = defaultdict(list)
+        for i, waits in enumerate(waiting):
+            for j in waits:
+                dependants[j].append(i)
+        results = {}
+        running = {}
+
+        if executor == 'process':
+            _plans[id(self)] = self
+            pool = ProcessPoolExecutor(workers,
+                                       mp_context=get_context('fork'))
+        else:
+            pool = ThreadPoolExecutor(workers)
+
+        def submit(i):
+            step = self.steps[i]
+            previous = value if i == 0 else results.get(i - 1)
+            inputs = {name: variables[name] for name in step.reads
+                      if name in variables}
+            if executor == 'process':
+                future = pool.submit(_call_step, id(self), i,
+                                     previous, inputs)
+            else:
+                future = pool.submit(copy_context().run, step.call,
+                                     previous, inputs)
+            running[future] = i
+
+        try:
+            with pool:
+                for i, waits in enumerate(waiting):
+                    if not waits:
+                        submit(i)
+                while running:
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i = running.pop(future)
+                        results[i] = future.result()
+                        log.debug("value from {}: {}".format(
+                            self.steps[i].activity, results[i]))
+                        if self.steps[i].variable:
+                            variables[self.steps[i].variable] = results[i]
+                        for j in dependants[i]:
+                            waiting[j].discard(i)
+                            if not waiting[j]:
+                                submit(j)
+        finally:
+            _plans.pop(id(self), None)
+        return results[len(self.steps) - 1]
+
+    async def execute_async(self, value=None):
+        '''Executes steps on the running event loop.
+
+        Independent steps, and subjects of every step, are awaited
+        concurrently; sync implementations run in the default executor.'''
+        if not self.steps:
+            return value
+        variables = self.module.variables
+        tasks = []
+
+        async def run(i, step, waits):
+            if waits:
+                await asyncio.gather(*[tasks[j] for j in waits])
+            previous = value if i == 0 else None
+            if step.chained and i > 0:
+                previous = tasks[i - 1].result()
+            inputs = {name: variables[name] for name in step.reads
+                      if name in variables}
+            result = await step.call_async(previous, inputs)
+            log.debug("value from {}: {}".format(step.activity, result))
+            if step.variable:
+                variables[step.variable] = result
+            return result
+
+        for i, (step, waits) in enumerate(zip(self.steps,
+                                               self.dependencies())):
+            tasks.append(asyncio.ensure_future(run(i, step, waits)))
+        results = await asyncio.gather(*tasks)
+        return results[-1]
+
+
+def _array(name):
+    'Splits T[] into T and True.'
+    if name is not None and name.endswith('[]'):
+        return name[:-2], True
+    return name, False
+
+
+def compile_activity(activity, module, implementation):
+    subjects = []
+    mapped = []
+    for i, s in enumerate(activity.subjects):
+        name, array = _array(s.name)
+        if array:
+            mapped.append(i)
+        if name in implementation.subjects:
+            loader = partial(implementation.subjects[name],
+                             _join(s.arguments))
+            subjects.append((name, loader))
+        else:
+            subjects.append((name, None))
+    variable, map_variable = _array(activity.variable)
+
+    condition = None
+    if activity.condition:
+        name = activity.condition.name
+        if name in implementation.conditions:
+            condition = partial(implementation.conditions[name],
+                                arguments=_join(activity.condition.arguments))
+        else:
+            condition = _missing('condition', name)
+
+    cached = None
+    name = activity.action.name
+    if name in implementation.actions:
+        handler = implementation.actions[name]
+        arguments = _join(activity.action.arguments)
+        action = partial(handler, arguments=arguments)
+        if implementation.result_cache is not None and \
+           getattr(handler, 'cache', False) and \
+           getattr(handler, 'source', None) is not None:
+            cached = (implementation.result_cache,
+                      implementation.result_cache.prefix(
+                          name, arguments, handler.source,
+                          (tuple(mapped), map_variable)))
+    elif name in module.modules:
+        action = partial(_execute_module, module.modules[name],
+                         implementation)
+    else:
+        action = _missing('action', name)
+
+    return Step(activity, variable, subjects, condition, action,
+                module.execution_path, implementation.subject_pool,
+                mapped, map_variable,
+                (implementation.map_workers, implementation.map_executor),
+                cached)
+
+
+def compile_module(module, implementation):
+    'Turns a module into a plan of steps bound to an implementation.'
+    return Plan(module, implementation, [
+        compile_activity(a, module, implementation)
+        for a in module.activities
+    ])
@@ -0,0 +1,150 @@
+from os import path, listdir
+from threading import RLock
+import ast
+import hashlib
+import json
+import logging
+
+log = logging.getLogger('Cookery')
+
+MANIFEST = 'manifest.json'
+KINDS = ('actions', 'subjects', 'conditions')
+
+_manifests = {}
+
+
+def subject_name(name):
+    'Changes a function name from foo_bar to FooBar.'
+    return "".join([e.capitalize() for e in name.split('_')])
+
+
+class Registry(dict):
+    '''Implementations of one kind, by name.
+
+    Names provided by files that have not been executed yet are known
+    from a manifest, the file is executed the first time one of them is
+    looked up.'''
+
+    def __init__(self, load, lock=None):
+        super().__init__()
+        # executes a file, registering its implementations
+        self.load = load
+        self.files = {}
+        # held while a file is loaded, lookups of its names wait for it
+        self.lock = lock or RLock()
+
+    def provide(self, name, file_name, replace=False):
+        '''Registers a file providing name. With replace, it takes
+        precedence over the one registered before, even if loaded.'''
+        with self.lock:
+            if replace:
+                dict.pop(self, name, None)
+                self.files[name] = file_name
+            else:
+                self.files.setdefault(name, file_name)
+
+    def _load(self, name):
+        with self.lock:
+            if dict.__contains__(self, name):
+                return True
+            file_name = self.files.get(name)
+            if file_name is None:
+                return False
+            self.load(file_name)
+            # kept until the file is loaded, a failed load is retried
+            self.files.pop(name, None)
+            return dict.__contains__(self, name)
+
+    def __missing__(self, name):
+        if self._load(name):
+            return dict.__getitem__(self, name)
+        raise KeyError(name)
+
+    def __contains__(self, name):
+        return dict.__contains__(self, name) or self._load(name)
+
+    def get(self, name, default=None):
+        return self[name] if name in self else default
+
+    def keys(self):
+        with self.lock:
+            return list(dict.keys(self)) + \
+                [name for name in self.files
+                 if not dict.__contains__(self, name)]
+
+    def __len__(self):
+        return len(self.keys())
+
+
+def scan(file_name):
+    'Returns names of implementations decorated in a file.'
+    with open(file_name, 'rb') as f:
+        tree = ast.parse(f.read(), file_name)
+    names = {kind: [] for kind in KINDS}
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call):
+                decorator = decorator.func
+            if not isinstance(decorator, ast.Attribute) or \
+               not isinstance(decorator.value, ast.Name) or \
+               decorator.value.id != 'cookery':
+                continue
+            if decorator.attr == 'action':
+                names['actions'].append(node.name)
+            elif decorator.attr == 'subject':
+                names['subjects'].append(subject_name(node.name))
+            elif decorator.attr == 'condition':
+                names['conditions'].append(node.name)
+    return names
+
+
+def _digest(file_name):
+    with open(file_name, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _files(directory):
+    return sorted(f for f in listdir(directory) if f.endswith('.py'))
+
+
+def build_manifest(directory):
+    'Returns the manifest of implementation files in a directory.'
+    manifest = {}
+    for f in _files(directory):
+        file_name = path.join(directory, f)
+        manifest[f] = dict(scan(file_name), sha256=_digest(file_name))
+    return manifest
+
+
+def write_manifest(directory):
+    manifest = build_manifest(directory)
+    with open(path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    _manifests.pop(directory, None)
+    return manifest
+
+
+def load_manifest(directory):
+    'Returns the manifest of a directory, read once per process.'
+    if directory not in _manifests:
+        _manifests[directory] = _load_manifest(directory)
+    return _manifests[directory]
+
+
+def _load_manifest(directory):
+    try:
+        with open(path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = None
+    if manifest is not None and \
+       sorted(manifest) == _files(directory) and \
+       all(_digest(path.join(directory, f)) == m['sha256']
+           for f, m in manifest.items()):
+        return manifest
+    log.warning('{} is out of date, run "cookery manifest {}" '
+                'to regenerate it'.format(MANIFEST, directory))
+    return build_manifest(directory)
@@ -0,0 +1,230 @@
+from ply.lex import LexToken, LexError
+from .cookery_lex import CookeryLexer
+import logging
+import re
+
+# runs of characters that never need a lookahead decision
+_NAME = re.compile(r'[\w-]*')
+_PATH = re.compile(r'[\w/.-]*')
+_MODULE = re.compile(r'\w*')
+_ACTION_ARGUMENT = re.compile(r'[^ .:]*')
+_ARGUMENT = re.compile(r'[^ {.:]*')
+
+_UPPER = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZ')
+_LOWER = frozenset('abcdefghijklmnopqrstuvwxyz')
+_KEYWORDS = frozenset(CookeryLexer.keywords)
+_STATES = frozenset(['INITIAL'] + [s for s, _ in CookeryLexer.states])
+
+
+class CookeryScanner(object):
+    '''Hand-written scanner producing the same tokens as CookeryLexer.
+
+    It makes a single forward pass over the input and implements the
+    lexer interface used by the parser (input, token, begin, clone).'''
+
+    log = logging.getLogger('Cookery')
+
+    def __init__(self):
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lexstate = 'INITIAL'
+        self.lineno = 1
+        # does not warn about illegal characters
+        self.quiet = False
+
+    def clone(self):
+        c = CookeryScanner()
+        c.__dict__.update(self.__dict__)
+        return c
+
+    def input(self, s):
+        if not isinstance(s, str):
+            raise ValueError('Expected a string')
+        self.lexdata = s
+        self.lexpos = 0
+        self.lexlen = len(s)
+
+    def begin(self, state):
+        if state not in _STATES:
+            raise ValueError('Undefined state')
+        self.lexstate = state
+
+    def current_state(self):
+        return self.lexstate
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t = self.token()
+        if t is None:
+            raise StopIteration
+        return t
+
+    def _token(self, type, start, end):
+        t = LexToken()
+        t.type = type
+        t.value = self.lexdata[start:end]
+        t.lineno = self.lineno
+        t.lexpos = start
+        self.lexpos = end
+        return t
+
+    def _keyword(self, t, states):
+        if t.value in _KEYWORDS:
+            t.type = t.value.upper()
+            if t.type in states:
+                self.lexstate = states[t.type]
+        return t
+
+    def _allowed(self, i):
+        'Negative lookahead of argument rules: no ":?\\.(\\s|\\Z)" at i.'
+        data = self.lexdata
+        if data[i] == ':':
+            i += 1
+            if i == self.lexlen or data[i] != '.':
+                return True
+        elif data[i] != '.':
+            return True
+        i += 1
+        return i < self.lexlen and not data[i].isspace()
+
+    def _argument(self, i, run, excluded):
+        'Returns the end of an argument starting at i.'
+        data = self.lexdata
+        n = self.lexlen
+        while True:
+            i = run.match(data, i).end()
+            if i == n:
+                return i
+            c = data[i]
+            if c == ':' and i + 1 < n and data[i + 1] not in excluded and \
+               self._allowed(i + 1):
+                i += 2
+            elif c not in excluded and self._allowed(i):
+                i += 1
+            else:
+                return i
+
+    def _name(self, i, array=False):
+        i = _NAME.match(self.lexdata, i + 1).end()
+        if array and self.lexdata.startswith('[]', i):
+            i += 2
+        return i
+
+    def _quoted_path(self, i):
+        data = self.lexdata
+        end = _PATH.match(data, i + 1).end()
+        if end > i + 1 and end < self.lexlen and data[end] == data[i]:
+            return end + 1
+        return None
+
+    def token(self):
+        data = self.lexdata
+        n = self.lexlen
+        i = self.lexpos
+
+        while i < n:
+            c = data[i]
+            if c in ' \t':
+                i += 1
+                continue
+
+            self.lexpos = i
+            state = self.lexstate
+
+            if data.startswith('import', i):
+                self.lexstate = 'import'
+                return self._token('IMPORT', i, i + 6)
+
+            if state == 'INITIAL':
+                if c in _UPPER:
+                    return self._token('VARIABLE', i, self._name(i, True))
+                if c in _LOWER:
+                    t = self._token('ACTION', i, self._name(i))
+                    if t.value in _KEYWORDS:
+                        t.type = t.value.upper()
+                    else:
+                        self.lexstate = 'subject'
+                    return t
+            elif state == 'import':
+                end = None
+                if c in '\'"':
+                    end = self._quoted_path(i)
+                else:
+                    end = _PATH.match(data, i).end()
+                    if end == i:
+                        end = None
+                if end is not None:
+                    t = self._token('PATH', i, end)
+                    if t.value in _KEYWORDS:
+                        t.type = t.value.upper()
+                    else:
+                        t.value = t.value.strip("'").strip('"')
+                        self.lexstate = 'importmodule'
+                    return t
+            elif state == 'importmodule':
+                end = _MODULE.match(data, i).end()
+                if end > i:
+                    t = self._token('MODULE', i, end)
+                    if t.value in _KEYWORDS:
+                        t.type = t.value.upper()
+                    else:
+                        self.lexstate = 'INITIAL'
+                    return t
+            elif state == 'subject':
+                if c not in _UPPER and c not in '{.':
+                    end = self._argument(i + 1, _ACTION_ARGUMENT, ' ')
+                    return self._keyword(
+                        self._token('ACTION_ARGUMENT', i, end),
+                        {'IF': 'condition', 'WITH': 'condition'}
+                    )
+                if c in _UPPER:
+                    self.lexstate = 'subjectargument'
+                    return self._token('SUBJECT', i, self._name(i, True))
+            elif state == 'subjectargument':
+                end = self._argument(i, _ARGUMENT, ' {')
+                if end > i:
+                    return self._keyword(
+                        self._token('SUBJECT_ARGUMENT', i, end),
+                        {'IF': 'condition', 'WITH': 'condition',
+                         'AND': 'subject'}
+                    )
+            elif state == 'condition':
+                if c in _LOWER:
+                    self.lexstate = 'conditionargument'
+                    return self._token('CONDITION', i, self._name(i))
+            elif state == 'conditionargument':
+                end = self._argument(i, _ARGUMENT, ' {')
+                if end > i:
+                    return self._token('CONDITION_ARGUMENT', i, end)
+
+            if c == '.':
+                self.lexstate = 'INITIAL'
+                return self._token('END', i, i + 1)
+            if c == '\n':
+                end = i
+                while end < n and data[end] == '\n':
+                    end += 1
+                self.lineno += end - i
+                i = end
+                continue
+            if c == '{':
+                end = data.find('}', i + 1)
+                if end > i + 1:
+                    return self._token('JSON', i, end + 1)
+            elif c == '#':
+                end = data.find('\n', i)
+                i = n if end == -1 else end
+                continue
+            elif c in CookeryLexer.literals:
+                return self._token(c, i, i + 1)
+
+            if not self.quiet:
+                self.log.warning("Illegal character '%s'" % c)
+            raise LexError("Scanning error. Illegal character '%s'" % c,
+                           data[i:])
+
+        self.lexpos = i
+        return None
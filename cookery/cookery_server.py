@@ -0,0 +1,135 @@
+from contextvars import ContextVar
+from io import StringIO
+from os import path, remove
+from threading import Lock
+import json
+import logging
+import socket
+import socketserver
+import sys
+
+log = logging.getLogger('Cookery')
+
+# writes text printed while a request is executed, None outside requests
+output = ContextVar('output', default=None)
+
+
+class Output(object):
+    'Standard output sending text printed by a request to its client.'
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        write = output.get()
+        if write is None:
+            return self.stream.write(text)
+        write(text)
+        return len(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    '''Executes one script and streams messages back, one JSON object per
+    line: {"output": text}, {"value": value}, then {"end": true} or
+    {"error": message}.'''
+
+    def handle(self):
+        lock = Lock()
+
+        def send(**message):
+            with lock:
+                self.wfile.write(json.dumps(message).encode() + b'\n')
+                self.wfile.flush()
+
+        output.set(lambda text: send(output=text))
+        try:
+            request = json.loads(self.rfile.readline().decode())
+            for value in self.server.execute(request):
+                send(value=str(value))
+        except (BrokenPipeError, ConnectionResetError):
+            log.debug('client disconnected')
+        except Exception as e:
+            log.exception('request failed')
+            send(error='{}: {}'.format(type(e).__name__, e))
+        else:
+            send(end=True)
+
+
+class CookeryServer(socketserver.ThreadingMixIn,
+                    socketserver.UnixStreamServer):
+    '''Executes scripts submitted over a Unix socket, each in its thread.
+
+    Keeps a Cookery instance per directory of scripts, so parser tables,
+    implementation files and protocol instances are reused by following
+    requests. Every request parses its own Module, so variables are never
+    shared, and paths are resolved against the directory of its script.'''
+
+    daemon_threads = True
+
+    def __init__(self, socket_path, factory):
+        # creates a Cookery instance for a directory of scripts
+        self.factory = factory
+        self.cookeries = {}
+        self.lock = Lock()
+        if path.exists(socket_path) and not listening(socket_path):
+            remove(socket_path)
+        super().__init__(socket_path, RequestHandler)
+
+    def cookery(self, directory):
+        with self.lock:
+            if directory not in self.cookeries:
+                log.debug('new instance for {}'.format(directory))
+                self.cookeries[directory] = self.factory()
+            return self.cookeries[directory]
+
+    def execute(self, request):
+        'Yields values of a request, every statement with stream.'
+        file_name = request['file']
+        cookery = self.cookery(path.dirname(file_name))
+        if 'source' in request:
+            file = StringIO(request['source'])
+            file.name = file_name
+        else:
+            file = open(file_name)
+        with file:
+            if request.get('async'):
+                import asyncio
+
+                yield asyncio.run(cookery.execute_file_async(file))
+            elif request.get('stream'):
+                yield from cookery.execute_stream(file)
+            else:
+                yield cookery.execute_file(file)
+
+    def server_activate(self):
+        super().server_activate()
+        if not isinstance(sys.stdout, Output):
+            sys.stdout = Output(sys.stdout)
+
+    def server_close(self):
+        super().server_close()
+        if path.exists(self.server_address):
+            remove(self.server_address)
+
+
+def listening(socket_path):
+    'Returns whether a server accepts connections on socket_path.'
+    with socket.socket(socket.AF_UNIX) as s:
+        try:
+            s.connect(socket_path)
+        except OSError:
+            return False
+    return True
+
+
+def submit(socket_path, request):
+    'Sends a request to a server, yields messages it sends back.'
+    with socket.socket(socket.AF_UNIX) as s:
+        s.connect(socket_path)
+        s.sendall(json.dumps(request).encode() + b'\n')
+        with s.makefile('r') as f:
+            for line in f:
+                yield json.loads(line)
@@ -0,0 +1,228 @@
+from base64 import b64encode
+from contextlib import contextmanager
+from email.header import Header
+from email.utils import formatdate, make_msgid
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+import atexit
+import logging
+import smtplib
+from .cookery_mapped import MappedFile
+
+log = logging.getLogger('Cookery')
+
+# base64 input of one line of 76 characters
+_LINE = 57
+_CHUNK = _LINE * 1024
+
+
+class SmtpPool(object):
+    '''Protocol of actions sending mail, one per Cookery instance.
+
+    Keeps authenticated SMTP connections and reuses them for following
+    messages, a connection idle for longer than idle seconds is checked
+    with NOOP before it is used again.'''
+
+    host = 'smtp.gmail.com'
+    port = 587
+    user = ''
+    password = ''
+    starttls = True
+    idle = 30
+    timeout = 60
+
+    def __init__(self):
+        # (host, port, user) -> [(connection, last used)]
+        self.connections = {}
+        self.lock = Lock()
+        atexit.register(self.close)
+
+    def settings(self, server=None):
+        'Reads smtp_host, smtp_port, smtp_user, smtp_password, starttls.'
+        server = server or {}
+        return (server.get('smtp_host', self.host),
+                server.get('smtp_port', self.port),
+                server.get('smtp_user', self.user),
+                server.get('smtp_password', self.password),
+                server.get('starttls', self.starttls))
+
+    def connect(self, host, port, user, password, starttls):
+        log.debug('connecting to {}:{}'.format(host, port))
+        smtp = smtplib.SMTP(host, port, timeout=self.timeout)
+        smtp.ehlo()
+        if starttls:
+            smtp.starttls()
+            smtp.ehlo()
+        if user:
+            smtp.login(user, password)
+        return smtp
+
+    def alive(self, smtp, used):
+        if monotonic() - used < self.idle:
+            return True
+        try:
+            return smtp.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+
+    @contextmanager
+    def connection(self, server=None):
+        'Lends a connection to the server, returned to the pool after use.'
+        host, port, user, password, starttls = self.settings(server)
+        key = (host, port, user)
+        smtp = None
+        with self.lock:
+            idle = self.connections.setdefault(key, [])
+        while smtp is None:
+            with self.lock:
+                if not idle:
+                    break
+                candidate, used = idle.pop()
+            if self.alive(candidate, used):
+                smtp = candidate
+        if smtp is None:
+            smtp = self.connect(host, port, user, password, starttls)
+        try:
+            yield smtp
+        except (smtplib.SMTPResponseException,
+                smtplib.SMTPRecipientsRefused):
+            # refused by the server, the connection can be used again
+            try:
+                smtp.rset()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+                raise
+            with self.lock:
+                idle.append((smtp, monotonic()))
+            raise
+        except BaseException:
+            # e.g. disconnected or interrupted in the middle of a message
+            smtp.close()
+            raise
+        else:
+            with self.lock:
+                idle.append((smtp, monotonic()))
+
+    def send(self, sender, recipients, chunks, server=None):
+        '''Sends a message given as an iterable of bytes, streamed to the
+        server without building it in memory.'''
+        started = []
+
+        def track():
+            for chunk in chunks:
+                started.append(True)
+                yield chunk
+
+        try:
+            with self.connection(server) as smtp:
+                return stream_message(smtp, sender, recipients, track())
+        except smtplib.SMTPServerDisconnected:
+            if started:
+                raise
+        # closed by the server while idle, before the message was sent
+        with self.connection(server) as smtp:
+            return stream_message(smtp, sender, recipients, track())
+
+    def close(self):
+        with self.lock:
+            connections = [smtp for idle in self.connections.values()
+                           for smtp, _ in idle]
+            self.connections.clear()
+        for smtp in connections:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+
+
+def stream_message(smtp, sender, recipients, chunks):
+    'Sends a message chunk by chunk with the DATA command.'
+    code, response = smtp.mail(sender)
+    if code != 250:
+        raise smtplib.SMTPSenderRefused(code, response, sender)
+    refused = {}
+    for recipient in recipients:
+        code, response = smtp.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, response)
+    if len(refused) == len(recipients):
+        smtp.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+    code, response = smtp.docmd('DATA')
+    if code != 354:
+        raise smtplib.SMTPDataError(code, response)
+    for chunk in chunks:
+        # transparency: lines starting with a dot are escaped, parts are
+        # produced line by line so a dot can only start a chunk
+        if chunk.startswith(b'.'):
+            chunk = b'.' + chunk
+        smtp.send(chunk.replace(b'\r\n.', b'\r\n..'))
+    smtp.send(b'.\r\n')
+    code, response = smtp.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, response)
+    return refused
+
+
+def _base64(blocks):
+    'Encodes blocks of bytes in lines of 76 characters.'
+    rest = b''
+    for block in blocks:
+        rest += block
+        end = len(rest) - len(rest) % _LINE
+        for i in range(0, end, _CHUNK):
+            data = b64encode(rest[i:min(end, i + _CHUNK)])
+            yield b'\r\n'.join(data[j:j + 76]
+                               for j in range(0, len(data), 76)) + b'\r\n'
+        rest = rest[end:]
+    if rest:
+        yield b64encode(rest) + b'\r\n'
+
+
+def _blocks(content):
+    'Yields bytes of an attachment without reading it whole.'
+    if isinstance(content, MappedFile):
+        for i in range(0, len(content), _CHUNK):
+            yield bytes(content[i:i + _CHUNK])
+    elif isinstance(content, (bytes, bytearray, memoryview)):
+        yield bytes(content)
+    elif isinstance(content, str):
+        yield content.encode('utf-8')
+    else:
+        # streams and other iterables of text or bytes
+        for item in content:
+            yield item if isinstance(item, bytes) else \
+                str(item).encode('utf-8')
+
+
+def message(sender, to, subject, body, attachments=()):
+    '''Yields a multipart message with attachments (name, content) as
+    chunks of bytes, contents are read as the message is sent.'''
+    boundary = uuid4().hex
+    headers = [
+        ('Subject', Header(subject, 'utf-8').encode()),
+        ('From', sender),
+        ('To', ', '.join(to)),
+        ('Date', formatdate(localtime=True)),
+        ('Message-ID', make_msgid()),
+        ('MIME-Version', '1.0'),
+        ('Content-Type', 'multipart/mixed; boundary="{}"'.format(boundary)),
+    ]
+    yield ''.join('{}: {}\r\n'.format(k, v) for k, v in headers).encode()
+    yield '\r\n--{}\r\n'.format(boundary).encode()
+    yield (b'Content-Type: text/plain; charset="utf-8"\r\n'
+           b'Content-Transfer-Encoding: base64\r\n\r\n')
+    yield from _base64([body.encode('utf-8')])
+    for name, content in attachments:
+        content_type = 'application/octet-stream' \
+            if isinstance(content, (bytes, bytearray, memoryview,
+                                    MappedFile)) \
+            else 'text/plain; charset="utf-8"'
+        yield '\r\n--{}\r\n'.format(boundary).encode()
+        yield ('Content-Type: {}\r\n'
+               'Content-Transfer-Encoding: base64\r\n'
+               'Content-Disposition: attachment; filename="{}"\r\n\r\n'.
+               format(content_type, name)).encode()
+        yield from _base64(_blocks(content))
+    yield '\r\n--{}--\r\n'.format(boundary).encode()
@@ -0,0 +1,123 @@
+from ply.lex import LexError
+from .cookery_mapped import MappedFile
+from .exceptions import CookeryStreamConsumed
+
+
+def iter_statements(stream, lexer):
+    '''Yields the source of every statement read from a file-like object.
+
+    A statement is yielded as soon as its END token arrives, only the
+    statement being read is kept in memory. Imports are yielded together
+    with the first activity that follows them. Every line is lexed from
+    the last token more input cannot change, so long statements are not
+    lexed again for each of their lines.'''
+    # incomplete statements (e.g. JSON spanning lines) are not errors
+    lexer.quiet = True
+    buffer = ''
+    # lexing resumes at pos in state
+    pos, state = 0, 'INITIAL'
+    for line in iter(stream.readline, ''):
+        buffer += line
+        end = 0
+        lexer.input(buffer)
+        lexer.lexpos = pos
+        lexer.begin(state)
+        try:
+            for t in lexer:
+                if t.type == 'END':
+                    end = t.lexpos + 1
+                # tokens look ahead two characters (e.g. '. ')
+                if lexer.lexpos < len(buffer) - 1:
+                    pos, state = lexer.lexpos, lexer.lexstate
+        except LexError:
+            # completed by the following lines
+            pass
+        if end:
+            yield buffer[:end]
+            buffer = buffer[end:]
+            if pos < end:
+                pos, state = 0, 'INITIAL'
+            else:
+                pos -= end
+    lexer.input(buffer)
+    lexer.begin('INITIAL')
+    try:
+        if lexer.token() is None:
+            return
+    except LexError:
+        pass
+    yield buffer
+
+
+class Stream(object):
+    '''Lazy sequence of items produced by a subject or an action.
+
+    It can be iterated once. Actions declared with stream=True receive it
+    as it is, other actions receive it materialized with join.'''
+
+    def __init__(self, iterable, join=list):
+        self.iterable = iterable
+        self.join = join
+        self.consumed = False
+
+    def __iter__(self):
+        if self.consumed:
+            raise CookeryStreamConsumed(repr(self))
+        self.consumed = True
+        return self._iterate()
+
+    def _iterate(self):
+        try:
+            yield from self.iterable
+        finally:
+            close = getattr(self.iterable, 'close', None)
+            if close is not None:
+                close()
+
+    def materialize(self):
+        return self.join(self)
+
+    def __repr__(self):
+        return 'Stream({!r})'.format(self.iterable)
+
+
+class FileStream(Stream):
+    '''Stream of the lines of a file, opened when it is iterated.
+
+    It knows its file, so it can be opened again for another pass and
+    identified by the path, modification time and size of the file.'''
+
+    def __init__(self, file_name, join=''.join, encoding=None):
+        super().__init__(None, join)
+        self.file_name = file_name
+        self.encoding = encoding
+
+    def _iterate(self):
+        with open(self.file_name, encoding=self.encoding) as f:
+            yield from f
+
+    def reopen(self):
+        'Returns a new stream of the same file.'
+        return FileStream(self.file_name, self.join, self.encoding)
+
+    def __repr__(self):
+        return 'FileStream({!r})'.format(self.file_name)
+
+
+def _materialize(value):
+    if isinstance(value, Stream):
+        return value.materialize()
+    if isinstance(value, MappedFile):
+        return value.text()
+    return value
+
+
+def materialize(subjects):
+    '''Returns subjects with streams replaced by their items and mapped
+    files by their text.'''
+    if subjects.__class__ is list:
+        for s in subjects:
+            if isinstance(s, (Stream, MappedFile)):
+                return [_materialize(s) for s in subjects]
+        return subjects
+    return _materialize(subjects)
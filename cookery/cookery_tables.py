@@ -0,0 +1,131 @@
+from os import path, remove
+from contextlib import contextmanager
+from copy import copy
+import importlib
+import logging
+import sys
+import ply.lex as lex
+import ply.yacc as yacc
+from .cookery_lex import CookeryLexer
+from .cookery_parse import CookeryParser
+from .cookery_cache import grammar_signature
+
+LEXTAB = 'cookery.cookery_lextab'
+PARSETAB = 'cookery.cookery_parsetab'
+
+log = logging.getLogger('Cookery')
+
+_tables = None
+
+
+class Tables(object):
+    '''Lexer and parser built once per process.
+
+    The prototypes are never used for lexing or parsing, every user gets
+    its own clone sharing the immutable tables.'''
+
+    def __init__(self, lexer, parser):
+        self.lexer = lexer
+        self.parser = parser
+
+    def new_lexer(self):
+        return self.lexer.clone()
+
+    def new_parser(self):
+        return copy(self.parser)
+
+
+class ParserPool(object):
+    '''Lexers and parsers lent for one parse at a time.
+
+    A pair is created on demand when all are in use, so any number of
+    threads parse at once. Parsers start every parse with new stacks,
+    lexers are returned to the initial state after use.'''
+
+    def __init__(self, new_lexer, new_parser):
+        self.new_lexer = new_lexer
+        self.new_parser = new_parser
+        # pop and append of a list are atomic, no lock is needed
+        self.idle = []
+
+    @contextmanager
+    def parser(self):
+        'Lends a (lexer, parser) pair.'
+        try:
+            lexer, parser = self.idle.pop()
+        except IndexError:
+            lexer, parser = self.new_lexer(), self.new_parser()
+        try:
+            yield lexer, parser
+        finally:
+            lexer.begin('INITIAL')
+            self.idle.append((lexer, parser))
+
+
+def _table_module(name):
+    'Imports a table module, returns None if missing or out of date.'
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        return None
+    if getattr(module, '_cookery_signature', None) != grammar_signature():
+        log.warning('{} is out of date, run "cookery tables" '
+                    'to regenerate it'.format(name))
+        return None
+    return module
+
+
+def _load_lexer():
+    lextab = _table_module(LEXTAB)
+    if lextab is None:
+        return lex.lex(module=CookeryLexer())
+    lexer = lex.Lexer()
+    lexer.lexoptimize = True
+    obj = CookeryLexer()
+    lexer.readtab(lextab, {k: getattr(obj, k) for k in dir(obj)})
+    return lexer
+
+
+def _load_parser():
+    parsetab = _table_module(PARSETAB)
+    if parsetab is None:
+        return yacc.yacc(module=CookeryParser(),
+                         write_tables=False,
+                         debug=False)
+    obj = CookeryParser()
+    lr = yacc.LRTable()
+    lr.read_table(parsetab)
+    lr.bind_callables({k: getattr(obj, k) for k in dir(obj)})
+    return yacc.LRParser(lr, obj.p_error)
+
+
+def load_tables():
+    'Returns tables shared by all Cookery instances in the process.'
+    global _tables
+    if _tables is None:
+        _tables = Tables(_load_lexer(), _load_parser())
+    return _tables
+
+
+def build_tables(outputdir=None):
+    'Regenerates table modules shipped with the package.'
+    global _tables
+    if outputdir is None:
+        outputdir = path.dirname(path.abspath(__file__))
+    for name in [LEXTAB, PARSETAB]:
+        file_name = path.join(outputdir, name.split('.')[-1] + '.py')
+        if path.exists(file_name):
+            remove(file_name)
+        sys.modules.pop(name, None)
+
+    lex.lex(module=CookeryLexer()).writetab(LEXTAB, outputdir)
+    yacc.yacc(module=CookeryParser(),
+              tabmodule=PARSETAB,
+              outputdir=outputdir,
+              debug=False)
+
+    for name in [LEXTAB, PARSETAB]:
+        file_name = path.join(outputdir, name.split('.')[-1] + '.py')
+        with open(file_name, 'a') as f:
+            f.write('_cookery_signature = {!r}\n'.format(grammar_signature()))
+    _tables = None
@@ -9,3 +9,16 @@ class CookeryWrongNumberOfArguments(Exception):
 class CookeryCannotImportModule(Exception):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+
+
+class CookerySubjectErrors(Exception):
+    "Failures of several subjects of one activity, as (name, error) pairs"
+    def __init__(self, errors):
+        super().__init__("; ".join("{}: {!r}".format(name, e)
+                                   for name, e in errors))
+        self.errors = errors
+
+
+class CookeryStreamConsumed(Exception):
+    "A stream is iterated more than once"
+    pass
@@ -1,3 +1,8 @@
+from os import path as os_path
+from cookery.cookery_stream import FileStream
+from cookery.cookery_mapped import MappedFile, MMAP_THRESHOLD
+from cookery.cookery_memo import mtime
+
 @cookery.action('')
 def do(subject):
     print('in do action with subject:', subject)
@@ -7,8 +12,15 @@ def do(subject):
 def echo(subject, text):
     return text
 
-@cookery.subject('in', r'(.+)')
+@cookery.subject('in', r'(.+)', cache=True, validate=mtime)
 def file(path):
     print('opening file:', repr(path))
-    f = open(path, 'r')
-    return f.read()
+    path = cookery.resolve_path(path)
+    if os_path.getsize(path) > MMAP_THRESHOLD:
+        return MappedFile(path)
+    return FileStream(path)
+
+@cookery.subject('in', r'(.+)', cache=True, validate=mtime)
+def mapped_file(path):
+    print('mapping file:', repr(path))
+    return MappedFile(cookery.resolve_path(path))
@@ -1,16 +1,26 @@
-@cookery.subject('http', r'(.+)')
-def remote_file(url):
-    import requests
+from cookery.cookery_http import HttpSession
 
-    r = requests.get(url)
-    return r.text
+# several URLs, separated by spaces, are fetched concurrently
+@cookery.subject('http', r'(.+)', protocol=HttpSession)
+def remote_file(http, urls):
+    urls = urls.split()
+    if len(urls) == 1:
+        return http.get(urls[0])
+    return http.get_all(urls)
+
+@cookery.subject('http', r'(\S+)', protocol=HttpSession, join='\n'.join)
+def remote_lines(http, url):
+    yield from http.lines(url)
+
+@cookery.subject('http', r'(\S+) to (.+)', protocol=HttpSession)
+def download(http, url, file_name):
+    return http.download(url, cookery.resolve_path(file_name))
 
 @cookery.action()
 def display(subject):
     print(repr(subject))
 
-@cookery.action()
-def google_prediction(subject, args):
+def prediction_models():
     from oauth2client.service_account import ServiceAccountCredentials
     from apiclient import discovery
     from httplib2 import Http
@@ -24,12 +34,26 @@ def google_prediction(subject, args):
     http_auth = Http()
     credentials.authorize(http_auth)
     prediction = discovery.build('prediction', 'v1.6', http=http_auth)
-    models = prediction.trainedmodels()
-    results = []
-    for data in subject:
-        r = models.predict(project='symbolic-button-852',
-                           id='language-detection',
-                           body={"input": {"csvInstance": [data]}})
-        results.append(r.execute()['outputLabel'])
+    return prediction, prediction.trainedmodels()
+
+# one HTTP request per batch, the API accepts up to 1000 calls in it; an
+# error of one call fails its whole batch, 100 bounds the calls lost
+@cookery.action(batch=100, cache=True)
+def google_prediction(subject, args):
+    prediction, models = prediction_models()
+    results = [None] * len(subject)
+
+    def store(request_id, response, exception):
+        if exception is not None:
+            raise exception
+        results[int(request_id)] = response['outputLabel']
+
+    batch = prediction.new_batch_http_request(callback=store)
+    for i, data in enumerate(subject):
+        batch.add(models.predict(project='symbolic-button-852',
+                                 id='language-detection',
+                                 body={"input": {"csvInstance": [data]}}),
+                  request_id=str(i))
+    batch.execute()
 
     return results
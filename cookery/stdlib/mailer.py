@@ -1,32 +1,26 @@
-@cookery.action('JSON')
-def send_email(subjects, args):
-    print('subjects:', subjects, ', args:', args)
-    import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
-
-    msg = MIMEMultipart()
-    msg['Subject'] = args['subject']
-    msg['From'] = args['from']
-    msg['To'] = args['to']
-    msg.attach(MIMEText(args['body']))
-    for i in range(len(subjects)):
-        atta = MIMEText(subjects[i])
-        atta.add_header('Content-Disposition',
-                        'attachment',
-                        filename='result-{}.txt'.format(i))
-        msg.attach(atta)
+from os import path as os_path
+from cookery.cookery_stream import FileStream
+from cookery.cookery_mapped import MappedFile, MMAP_THRESHOLD
+from cookery.cookery_memo import mtime
+from cookery.cookery_smtp import SmtpPool, message
 
-    mailServer = smtplib.SMTP("smtp.gmail.com", 587)
-    mailServer.ehlo()
-    mailServer.starttls()
-    mailServer.ehlo()
-    mailServer.login('', '')
-    mailServer.send_message(msg)
-    mailServer.quit()
+# args: subject, from, to (one address or a list) and body, optionally
+# smtp_host, smtp_port, smtp_user, smtp_password and starttls
+@cookery.action('JSON', stream=True, protocol=SmtpPool)
+def send_email(smtp, subjects, args):
+    print('subjects:', subjects, ', args:', args)
+    to = args['to'] if isinstance(args['to'], list) else [args['to']]
+    attachments = [('result-{}.txt'.format(i), subject)
+                   for i, subject in enumerate(subjects or [])]
+    smtp.send(args['from'], to,
+              message(args['from'], to, args['subject'], args['body'],
+                      attachments),
+              args)
 
-@cookery.subject('in', r'(.+)')
+@cookery.subject('in', r'(.+)', cache=True, validate=mtime)
 def file(path):
     print('opening file:', repr(path))
-    f = open(path, 'r')
-    return f.read()
+    path = cookery.resolve_path(path)
+    if os_path.getsize(path) > MMAP_THRESHOLD:
+        return MappedFile(path)
+    return FileStream(path)
@@ -1,18 +1,58 @@
 import click
-from os import path, makedirs, walk
-from .cookery import Cookery
-import ply.yacc as yacc
-import ply.lex as lex
-from .cookery_lex import CookeryLexer
-from .cookery_parse import CookeryParser
-from tempfile import TemporaryDirectory
-from zipfile import ZipFile
-from io import BytesIO
-from shutil import copy as copy_file
-from botocore.exceptions import ClientError
-
-
-@click.group()
+import importlib
+from os import path, makedirs
+
+
+class LazyGroup(click.Group):
+    '''Group importing subcommands only when they are invoked.
+
+    lazy_subcommands maps names to ("module:command", short help), so the
+    list of commands is printed without importing their dependencies.'''
+
+    def __init__(self, *args, lazy_subcommands=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted(super().list_commands(ctx) +
+                      list(self.lazy_subcommands))
+
+    def get_command(self, ctx, name):
+        if name not in self.lazy_subcommands:
+            return super().get_command(ctx, name)
+        module, command = self.lazy_subcommands[name][0].split(':')
+        return getattr(importlib.import_module(module), command)
+
+    def format_commands(self, ctx, formatter):
+        names = self.list_commands(ctx)
+        limit = formatter.width - 6 - max(map(len, names), default=0)
+        rows = []
+        for name in names:
+            if name in self.lazy_subcommands:
+                rows.append((name, self.lazy_subcommands[name][1]))
+                continue
+            command = super().get_command(ctx, name)
+            if command is not None and not command.hidden:
+                rows.append((name, command.get_short_help_str(limit)))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+
+@click.group(cls=LazyGroup, lazy_subcommands={
+    'run': ('cookery.toolkit_run:run', 'Executes a file.'),
+    'eval': ('cookery.toolkit_run:eval', 'Evaluates an expression.'),
+    'serve': ('cookery.toolkit_run:serve',
+              'Executes files submitted by "cookery run --server".'),
+    'gc': ('cookery.toolkit_cache:gc',
+           'Removes old parse trees and results from the cache.'),
+    'tables': ('cookery.toolkit_grammar:tables',
+               'Regenerates lexer and parser tables shipped with Cookery.'),
+    'test': ('cookery.toolkit_grammar:test',
+             'Compares tokens of the lexer and the scanner.'),
+    'lambda': ('cookery.toolkit_lambda:amazon_lambda',
+               'Deploys a file to Amazon Lambda.'),
+})
 @click.option('-c', '--config',
               type=click.File('r'),
               help='Config file.')
@@ -35,6 +75,10 @@ from botocore.exceptions import ClientError
               is_flag=True,
               default=False,
               help='Runs parser in debug mode')
+@click.option('--scanner',
+              is_flag=True,
+              default=False,
+              help='Uses the hand-written scanner instead of the PLY lexer')
 @click.pass_context
 def toolkit(ctx,
             config,
@@ -42,31 +86,13 @@ def toolkit(ctx,
             print_config,
             debug,
             debug_lexer,
-            debug_parser):
+            debug_parser,
+            scanner):
     ctx.obj = {}
     ctx.obj['debug'] = debug
     ctx.obj['debug_lexer'] = debug_lexer
     ctx.obj['debug_parser'] = debug_parser
-
-
-@toolkit.command()
-@click.argument('file', type=click.File('r'))
-@click.pass_context
-def run(ctx, file):
-    'Executes a file.'
-    cookery = Cookery(ctx.parent.params['debug'],
-                      ctx.parent.params['debug_lexer'],
-                      ctx.parent.params['debug_parser'])
-    print('returned value:', cookery.execute_file(file))
-
-
-@toolkit.command()
-@click.argument('expression')
-@click.pass_context
-def eval(ctx, expression):
-    'Evaluates an expression.'
-    c = Cookery(**ctx.obj)
-    click.echo(c.execute_expression(expression))
+    ctx.obj['scanner'] = scanner
 
 
 @toolkit.command()
@@ -130,125 +156,6 @@ def kernel(ctx, uninstall):
         )
 
 
-@toolkit.command("lambda")
-@click.option("--name", help=".")
-@click.option(
-    "--interval",
-    type=(
-        int,
-        click.Choice(["minute", "minutes", "hour", "hours", "day", "days"])
-    ),
-    default=(1, "day"),
-    help="""Interval: Value Unit
-Value can be a positive integer, Unit can be minute(s), hour(s), or day(s)."""
-)
-@click.option("--key", envvar='ACCESS_KEY', help="Amazon Access Key.")
-@click.option("--secret", envvar='SECRET_KEY', help="Amazon Secret Key.")
-@click.option("--region", envvar='REGION', default="eu-central-1", help="Amazon Region.")
-@click.option("--arn", envvar='ARN', help="Amazon user ARN.")
-@click.argument('file_name', type=click.Path(
-    exists=True,
-    dir_okay=False,
-    readable=True,
-    resolve_path=True
-))
-@click.pass_context
-def amazon_lambda(ctx, name, interval, key, secret, region, arn, file_name):
-    import boto3
-    import pip
-
-    handler_file = "lambda"
-    handler_function = "lambda_handler"
-
-    if not path.exists(file_name):
-        print("no such module", file_name)
-        return
-
-    print([key, secret, region, arn])
-    if any([i is None for i in [key, secret, region, arn]]):
-        for param, key in [(key, "key"), (secret, "secret"), (region, "region"), (arn, "arn")]:
-            if param is None:
-                print("amazon", key, "is not provided")
-
-    if name is None:
-        name = path.splitext(path.basename(file_name))[0]
-
-    # temporary file to keep all the data sent to amazon lambda
-    pkg_temp = TemporaryDirectory(prefix="cookery-lambda-", suffix=name)
-    # cookery framework path, used in pip command
-    cookery_path = path.join(path.dirname(path.realpath(__file__)), "..")
-    pip.main(["install", cookery_path, "-t", pkg_temp.name])
-
-    copy_file(file_name, pkg_temp.name)
-    cookery_module, _ext = path.splitext(file_name)
-    for f in [cookery_module + ext for ext in [".py", ".toml"]]:
-        if path.exists(f):
-            copy_file(f, pkg_temp.name)
-
-    with open(path.join(pkg_temp.name, f"{handler_file}.py"), "w") as f:
-        f.write("from cookery.cookery import Cookery\n\n\n"
-                f"def {handler_function}(event, context):\n"
-                f"    print('returned value:', Cookery().execute_file(\"{name}\"))\n"
-                "    return {'message': \"it works!\"}\n")
-
-    boto_args = {
-        "aws_access_key_id": key,
-        "aws_secret_access_key": secret,
-        "region_name": region
-    }
-    lambda_client = boto3.client("lambda", **boto_args)
-    events_client = boto3.client("events", **boto_args)
-
-    buf = BytesIO()
-    # buf = open("/tmp/test.zip", "wb")
-    with ZipFile(buf, "w") as f:
-        for root, _dirs, files in walk(pkg_temp.name):
-            for file in files:
-                filename = path.join(root, file)
-                arcname = filename[len(pkg_temp.name):]
-                f.write(filename, arcname)
-
-    try:
-        lambda_client.create_function(
-            FunctionName=name,
-            Runtime="python3.6",
-            Role=arn,
-            Handler=f"{handler_file}.{handler_function}",
-            Code={"ZipFile": buf.getvalue()},
-            Timeout=10,
-            MemorySize=128,
-            Publish=False,
-        )
-        function_arn = lambda_client.get_function(
-            FunctionName=name
-        )["Configuration"]["FunctionArn"]
-        events_client.put_rule(
-            Name=f"rule-{name}",
-            ScheduleExpression="rate(%d %s)" % interval,
-            State="ENABLED",
-            Description=f"Run {name} every %d %s." % interval,
-            RoneArn=arn,
-        )
-        events_client.put_targets(
-            Rule=f"rule-{name}",
-            Targets=[{
-                "Id": name,
-                "Arn": function_arn
-            }]
-        )
-    except ClientError as e:
-        if e.response['Error']['Code'] == "ResourceConflictException":
-            print(f"function {name} already exists, updating...")
-            lambda_client.update_function_code(
-                FunctionName=name,
-                ZipFile=buf.getvalue(),
-                Publish=False,
-            )
-        else:
-            print(e)
-
-
-
 @toolkit.command()
 @click.pass_context
 def get(ctx):
@@ -257,55 +164,20 @@ def get(ctx):
 
 
 @toolkit.command()
-def test():
-    lexer = lex.lex(module=CookeryLexer())
-    parser = yacc.yacc(module=CookeryParser())
-
-    expressions = [
-        "do.",
-        "do B.",
-        "A = do B.",
-        "do Aa and Bb.",
-        "do {'a': 2}.",
-        "do Aaa {'a': 2}.",
-        '''create-email {"to"      : "mikolajb@gmail.com",
-                     "from"    : "mikolajb@gmail.com",
-                     "subject" : "Results",
-                     "body"    : "Results for language test"}.''',
-        'import "a/a" as b a.',
-        'import \'b\' as b a.',
-        '''import \'a\' as a
-           import \'b\' as b
-           d.''',
-        'Test = read File.',
-        'read with something.',
-        'read.',
-        'Test = read File with something.',
-        'read File /tmp/test.txt.',
-        '''Test = read very http://example.com slowly File
-          file:///tmp/test.txt with something.''',
-        'read very slowly.',
-        'read File with test.',
-        'read very slowly with something.',
-        'read very slowly with something else like this ftp://test.txt.',
-        'Test = read File1 and File2 with something.',
-        'Test = read File1 and File2[] and File3.',
-        'Test = read File1 /tmp/test.txt and File2 with something.',
-        'Test = read File1 /tmp/test.txt and File2 /tmp/test.aaa.',
-        'T[] = read.',
-        'read T[].',
-        'do File. do File. do File.',
-    ]
-
-    for expression in expressions:
-        debug = False
-        print('--------------------------------------------------')
-        print("parsing:", expression)
-        print()
-        t = parser.parse(expression, lexer=lexer, debug=debug)
-        print(t.pretty_print())
-        parser.restart()
-        lexer.begin('INITIAL')
+@click.argument('directory',
+                type=click.Path(exists=True, file_okay=False),
+                required=False)
+def manifest(directory):
+    'Regenerates the manifest of implementations in a directory.'
+    from .cookery import Cookery
+    from .cookery_registry import write_manifest, KINDS
+
+    if directory is None:
+        directory = path.join(path.dirname(path.abspath(__file__)),
+                              Cookery.STDLIB_PATH)
+    for f, names in sorted(write_manifest(directory).items()):
+        print('{}: {}'.format(f, ', '.join(
+            name for kind in KINDS for name in names[kind])))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,19 @@
+import click
+from .cookery_cache import DEFAULT_CACHE_DIR, collect_garbage
+
+
+@click.command()
+@click.option('--cache-dir',
+              type=click.Path(file_okay=False),
+              default=DEFAULT_CACHE_DIR,
+              show_default=True,
+              help='Directory of the cache.')
+@click.option('--max-age',
+              type=float,
+              default=30,
+              show_default=True,
+              help='Removes entries unused for this many days.')
+def gc(cache_dir, max_age):
+    'Removes old parse trees and results from the cache.'
+    removed, size = collect_garbage(cache_dir, max_age * 24 * 60 * 60)
+    print('removed {} entries, {} bytes'.format(removed, size))
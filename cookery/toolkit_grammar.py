@@ -0,0 +1,98 @@
+import click
+from .cookery_tables import load_tables, build_tables
+from .cookery_scanner import CookeryScanner
+from ply.lex import LexError
+
+
+# samples of the language, the lexer and the scanner agree on their tokens
+EXPRESSIONS = [
+    "do.",
+    "do B.",
+    "A = do B.",
+    "do Aa and Bb.",
+    "do {'a': 2}.",
+    "do Aaa {'a': 2}.",
+    '''create-email {"to"      : "mikolajb@gmail.com",
+                 "from"    : "mikolajb@gmail.com",
+                 "subject" : "Results",
+                 "body"    : "Results for language test"}.''',
+    'import "a/a" as b a.',
+    'import \'b\' as b a.',
+    '''import \'a\' as a
+       import \'b\' as b
+       d.''',
+    'Test = read File.',
+    'read with something.',
+    'read.',
+    'Test = read File with something.',
+    'read File /tmp/test.txt.',
+    '''Test = read very http://example.com slowly File
+      file:///tmp/test.txt with something.''',
+    'read very slowly.',
+    'read File with test.',
+    'read very slowly with something.',
+    'read very slowly with something else like this ftp://test.txt.',
+    'Test = read File1 and File2 with something.',
+    'Test = read File1 and File2[] and File3.',
+    'Test = read File1 /tmp/test.txt and File2 with something.',
+    'Test = read File1 /tmp/test.txt and File2 /tmp/test.aaa.',
+    'T[] = read.',
+    'read T[].',
+    'do File. do File. do File.',
+    'read File1 a:b:. and File2 x.y with c:.',
+    'import important as i\n# comment\ndo it.',
+]
+
+
+def tokens(lexer, expression):
+    'Returns tokens of an expression, or the position of a lexing error.'
+    lexer.input(expression)
+    lexer.begin('INITIAL')
+    lexer.lineno = 1
+    try:
+        return [(t.type, t.value, t.lineno, t.lexpos) for t in lexer]
+    except LexError:
+        return [('error', lexer.lexpos)]
+
+
+@click.command()
+def tables():
+    'Regenerates lexer and parser tables shipped with Cookery.'
+    build_tables()
+
+
+@click.command()
+def test():
+    'Compares tokens of the lexer and the scanner.'
+    tables = load_tables()
+    lexer = tables.new_lexer()
+    parser = tables.new_parser()
+    scanner = CookeryScanner()
+
+    mismatches = 0
+    for expression in EXPRESSIONS:
+        debug = False
+        print('--------------------------------------------------')
+        print("parsing:", expression)
+        print()
+        expected = tokens(lexer, expression)
+        scanned = tokens(scanner, expression)
+        if expected != scanned:
+            mismatches += 1
+            print('scanner mismatch:')
+            print('  lexer:  ', expected)
+            print('  scanner:', scanned)
+        lexer.begin('INITIAL')
+        try:
+            t = parser.parse(expression, lexer=lexer, debug=debug)
+        except LexError as e:
+            print(e)
+            t = None
+        if t is None:
+            continue
+        print(t.pretty_print())
+        parser.restart()
+        lexer.begin('INITIAL')
+    if mismatches:
+        raise click.ClickException(
+            '{} expressions scanned differently'.format(mismatches))
@@ -0,0 +1,136 @@
+import click
+from os import path
+from botocore.exceptions import ClientError
+from .cookery_cache import DEFAULT_CACHE_DIR
+from .cookery_lambda import package, runtime, HANDLER_FILE, \
+    HANDLER_FUNCTION
+
+
+@click.command("lambda")
+@click.option("--name", help=".")
+@click.option(
+    "--interval",
+    type=(
+        int,
+        click.Choice(["minute", "minutes", "hour", "hours", "day", "days"])
+    ),
+    default=(1, "day"),
+    help="""Interval: Value Unit
+Value can be a positive integer, Unit can be minute(s), hour(s), or day(s)."""
+)
+@click.option("--key", envvar='ACCESS_KEY', help="Amazon Access Key.")
+@click.option("--secret", envvar='SECRET_KEY', help="Amazon Secret Key.")
+@click.option("--region", envvar='REGION', default="eu-central-1", help="Amazon Region.")
+@click.option("--arn", envvar='ARN', help="Amazon user ARN.")
+@click.option("--endpoint-url", envvar='ENDPOINT_URL',
+              help="URL of the Lambda and Events APIs, e.g. a local "
+                   "stand-in.")
+@click.option("--cache-dir",
+              type=click.Path(file_okay=False),
+              default=path.join(DEFAULT_CACHE_DIR, "lambda"),
+              show_default=True,
+              help="Directory of built packages and dependencies.")
+@click.option("--requirements",
+              type=click.Path(exists=True, dir_okay=False),
+              help="Requirements installed next to cookery.")
+@click.argument('file_name', type=click.Path(
+    exists=True,
+    dir_okay=False,
+    readable=True,
+    resolve_path=True
+))
+@click.pass_context
+def amazon_lambda(ctx, name, interval, key, secret, region, arn,
+                  endpoint_url, cache_dir, requirements, file_name):
+    '''Deploys a file to Amazon Lambda.
+
+    The package is rebuilt from cached dependencies and uploaded only when
+    it differs from the deployed code. The function runs on the version of
+    Python running this command, the one its dependencies are built with.'''
+    import boto3
+
+    if not path.exists(file_name):
+        print("no such module", file_name)
+        return
+
+    print([key, secret, region, arn])
+    if any([i is None for i in [key, secret, region, arn]]):
+        for param, key in [(key, "key"), (secret, "secret"), (region, "region"), (arn, "arn")]:
+            if param is None:
+                print("amazon", key, "is not provided")
+
+    if name is None:
+        name = path.splitext(path.basename(file_name))[0]
+
+    zip_name, code_sha256 = package(file_name, name, cache_dir, requirements)
+
+    boto_args = {
+        "aws_access_key_id": key,
+        "aws_secret_access_key": secret,
+        "region_name": region,
+        "endpoint_url": endpoint_url,
+    }
+    lambda_client = boto3.client("lambda", **boto_args)
+    events_client = boto3.client("events", **boto_args)
+
+    try:
+        try:
+            deployed = lambda_client.get_function(
+                FunctionName=name
+            )["Configuration"]
+        except ClientError as e:
+            if e.response['Error']['Code'] != "ResourceNotFoundException":
+                raise
+            deployed = None
+        if deployed is not None and deployed.get("Runtime") != runtime():
+            print(f"function {name} runs {deployed.get('Runtime')}, "
+                  f"changing it to {runtime()}...")
+            lambda_client.update_function_configuration(
+                FunctionName=name,
+                Runtime=runtime(),
+            )
+            lambda_client.get_waiter("function_updated").wait(
+                FunctionName=name
+            )
+        if deployed is not None and deployed["CodeSha256"] == code_sha256:
+            print(f"function {name} is up to date")
+            return
+        with open(zip_name, "rb") as f:
+            code = f.read()
+        if deployed is not None:
+            print(f"function {name} already exists, updating...")
+            lambda_client.update_function_code(
+                FunctionName=name,
+                ZipFile=code,
+                Publish=False,
+            )
+            return
+        lambda_client.create_function(
+            FunctionName=name,
+            Runtime=runtime(),
+            Role=arn,
+            Handler=f"{HANDLER_FILE}.{HANDLER_FUNCTION}",
+            Code={"ZipFile": code},
+            Timeout=10,
+            MemorySize=128,
+            Publish=False,
+        )
+        function_arn = lambda_client.get_function(
+            FunctionName=name
+        )["Configuration"]["FunctionArn"]
+        events_client.put_rule(
+            Name=f"rule-{name}",
+            ScheduleExpression="rate(%d %s)" % interval,
+            State="ENABLED",
+            Description=f"Run {name} every %d %s." % interval,
+            RoleArn=arn,
+        )
+        events_client.put_targets(
+            Rule=f"rule-{name}",
+            Targets=[{
+                "Id": name,
+                "Arn": function_arn
+            }]
+        )
+    except ClientError as e:
+        print(e)
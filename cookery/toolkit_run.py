@@ -0,0 +1,165 @@
+import click
+from os import path, getcwd, makedirs
+from .cookery_cache import DEFAULT_CACHE_DIR
+
+DEFAULT_SOCKET = path.join(DEFAULT_CACHE_DIR, 'cookery.sock')
+
+# options of commands executing scripts, the server is configured by them
+EXECUTION_OPTIONS = [
+    click.option('--cache-dir',
+                 type=click.Path(file_okay=False),
+                 default=DEFAULT_CACHE_DIR,
+                 show_default=True,
+                 help='Directory for cached parse trees and results, '
+                      'a relative path is resolved next to the script.'),
+    click.option('--no-cache',
+                 is_flag=True,
+                 default=False,
+                 help='Parses the script and runs every action again.'),
+    click.option('--workers',
+                 type=int,
+                 help='Runs independent activities concurrently '
+                      'on a pool of workers.'),
+    click.option('--executor',
+                 type=click.Choice(['thread', 'process']),
+                 default='thread',
+                 show_default=True,
+                 help='Kind of the pool of workers.'),
+    click.option('--subject-workers',
+                 type=int,
+                 help='Loads subjects of one activity concurrently '
+                      'on a pool of threads.'),
+    click.option('--map-workers',
+                 type=int,
+                 help='Spreads actions mapped over T[] on a pool of workers.'),
+    click.option('--map-executor',
+                 type=click.Choice(['thread', 'process']),
+                 default='process',
+                 show_default=True,
+                 help='Kind of the pool of mapped actions.'),
+]
+
+
+def execution_options(command):
+    for option in reversed(EXECUTION_OPTIONS):
+        command = option(command)
+    return command
+
+
+def new_cookery(ctx, cache_dir, no_cache, workers, executor,
+                subject_workers, map_workers, map_executor):
+    from .cookery import Cookery
+
+    if no_cache:
+        cache_dir = None
+    return Cookery(ctx.parent.params['debug'],
+                   ctx.parent.params['debug_lexer'],
+                   ctx.parent.params['debug_parser'],
+                   cache_dir=cache_dir,
+                   scanner=ctx.parent.params['scanner'],
+                   workers=workers,
+                   executor=executor,
+                   subject_workers=subject_workers,
+                   map_workers=map_workers,
+                   map_executor=map_executor)
+
+
+@click.command()
+@execution_options
+@click.option('--stream',
+              is_flag=True,
+              default=False,
+              help='Executes every statement as soon as it is read, '
+                   'always on when FILE is -.')
+@click.option('--async', 'use_async',
+              is_flag=True,
+              default=False,
+              help='Executes on an event loop, awaiting async actions '
+                   'and subjects concurrently.')
+@click.option('--server',
+              is_flag=True,
+              default=False,
+              help='Submits the file to a running "cookery serve", '
+                   'options of execution are the ones of the server.')
+@click.option('--socket', 'socket_path',
+              type=click.Path(dir_okay=False),
+              default=DEFAULT_SOCKET,
+              show_default=True,
+              help='Socket of the server.')
+@click.argument('file', type=click.File('r'))
+@click.pass_context
+def run(ctx, stream, use_async, server, socket_path, file, **options):
+    'Executes a file.'
+    if server:
+        submit(socket_path, file, stream, use_async)
+        return
+    cookery = new_cookery(ctx, **options)
+    if use_async:
+        import asyncio
+
+        print('returned value:',
+              asyncio.run(cookery.execute_file_async(file)))
+    elif stream or file.name == '<stdin>':
+        for value in cookery.execute_stream(file):
+            print('returned value:', value)
+    else:
+        print('returned value:', cookery.execute_file(file))
+
+
+def submit(socket_path, file, stream, use_async):
+    from .cookery_server import submit
+
+    request = {'file': path.abspath(file.name),
+               'stream': stream,
+               'async': use_async}
+    if file.name == '<stdin>':
+        request.update(file=path.join(getcwd(), file.name),
+                       source=file.read(),
+                       stream=True)
+    try:
+        for message in submit(socket_path, request):
+            if 'output' in message:
+                click.echo(message['output'], nl=False)
+            elif 'value' in message:
+                print('returned value:', message['value'])
+            elif 'error' in message:
+                raise click.ClickException(message['error'])
+    except (FileNotFoundError, ConnectionRefusedError):
+        raise click.ClickException(
+            'no server on {}, start one with "cookery serve"'.format(
+                socket_path))
+
+
+@click.command()
+@execution_options
+@click.option('--socket', 'socket_path',
+              type=click.Path(dir_okay=False),
+              default=DEFAULT_SOCKET,
+              show_default=True,
+              help='Socket to listen on.')
+@click.pass_context
+def serve(ctx, socket_path, **options):
+    'Executes files submitted by "cookery run --server".'
+    from .cookery_server import CookeryServer
+
+    directory = path.dirname(socket_path)
+    if directory:
+        makedirs(directory, exist_ok=True)
+    with CookeryServer(socket_path, lambda: new_cookery(ctx, **options)) \
+            as server:
+        click.echo('listening on {}'.format(socket_path), err=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+@click.command()
+@click.argument('expression')
+@click.pass_context
+def eval(ctx, expression):
+    'Evaluates an expression.'
+    from .cookery import Cookery
+
+    c = Cookery(**ctx.obj)
+    click.echo(c.execute_expression(expression))
@@ -1,13 +1,17 @@
-@cookery.action()
-def split(subjects):
-    return subjects[0].split()
+from cookery.cookery_stream import Stream
 
-@cookery.action()
-def count(subjects):
-    return len(subjects[0])
+
+@cookery.action(stream=True)
+def split(lines):
+    for line in lines:
+        yield from line.split()
+
+@cookery.action(stream=True)
+def count(words):
+    return sum(1 for _ in words)
 
 @cookery.subject('in', r'(.+)')
 def file(path):
     print('opening file:', repr(path))
-    f = open(path, 'r')
-    return f.read()
+    path = cookery.resolve_path(path)
+    return Stream(open(path, 'r'), ''.join)
@@ -13,6 +13,7 @@ setup(name="cookery",
           "cookery": [
               "stdlib/*.py",
               "stdlib/*.cookery",
+              "stdlib/manifest.json",
               "cookerykernel/kernel.json",
           ]
       },
@@ -0,0 +1,100 @@
+from threading import get_ident
+import asyncio
+import pytest
+from cookery.cookery import Cookery
+from cookery.exceptions import CookerySubjectErrors
+
+
+def failing(cookery):
+    @cookery.subject('in', r'(.*)')
+    def broken(text):
+        raise ValueError(text)
+
+    @cookery.subject('in', r'(.*)')
+    async def failing(text):
+        raise KeyError(text)
+
+    @cookery.subject('in', r'(.*)')
+    def value(text):
+        return text
+
+    @cookery.action()
+    def keep(*subjects):
+        return list(subjects)
+    return cookery
+
+
+def sync(cookery, expression):
+    return cookery.execute_expression(expression)
+
+
+def run_async(cookery, expression):
+    return asyncio.run(cookery.execute_expression_async(expression))
+
+
+@pytest.mark.parametrize('execute', [sync, run_async])
+@pytest.mark.parametrize('workers', [None, 2])
+def test_every_failed_subject_is_reported(execute, workers):
+    cookery = failing(Cookery(subject_workers=workers))
+    with pytest.raises(CookerySubjectErrors) as info:
+        execute(cookery, 'keep Broken a and Value x and Failing b and Y.')
+    errors = info.value.errors
+    assert [name for name, _ in errors] == ['Broken', 'Failing', 'Y']
+    assert [type(e) for _, e in errors] == \
+        [ValueError, KeyError, NotImplementedError]
+    # one failure is raised as it is
+    with pytest.raises(KeyError):
+        execute(cookery, 'keep Failing b and Value x.')
+    assert execute(cookery, 'keep Value x and Value y.') == ['x', 'y']
+
+
+def test_async_subjects_and_activities_are_awaited_concurrently():
+    cookery = failing(Cookery())
+    arrived = {'subjects': [], 'actions': []}
+
+    async def meet(group, name):
+        # returns only when two callers of the group wait at the same time
+        arrived[group].append(name)
+        while len(arrived[group]) < 2:
+            await asyncio.sleep(0.001)
+        return name
+
+    @cookery.subject('in', r'(.*)')
+    async def gate(text):
+        return await meet('subjects', text)
+
+    @cookery.action()
+    async def wait(text):
+        return await meet('actions', text)
+
+    async def main():
+        return await asyncio.wait_for(cookery.execute_expression_async(
+            'A = keep Gate a and Gate b. B = wait Value c. C = wait Value d. '
+            'keep A and B and C.'), 5)
+
+    assert asyncio.run(main()) == [['a', 'b'], 'c', 'd']
+
+
+def test_sync_implementations_run_in_the_executor():
+    cookery = Cookery()
+    threads = []
+
+    @cookery.subject('in', r'(.*)')
+    def value(text):
+        threads.append(get_ident())
+        return text
+
+    @cookery.action()
+    def keep(*subjects):
+        threads.append(get_ident())
+        return list(subjects)
+
+    async def main():
+        loop = get_ident()
+        value = await cookery.execute_expression_async(
+            'keep Value a and Value b.')
+        return loop, value
+
+    loop, value = asyncio.run(main())
+    assert value == ['a', 'b']
+    assert len(threads) == 3 and loop not in threads
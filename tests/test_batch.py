@@ -0,0 +1,74 @@
+from threading import Barrier
+import pytest
+from cookery.cookery import Cookery
+
+
+@pytest.fixture
+def cookery():
+    cookery = Cookery()
+
+    @cookery.subject('in', r'(\d+)')
+    def nums(n):
+        return list(range(int(n)))
+
+    @cookery.subject('in', r'(.*)')
+    def value(text):
+        return text
+
+    return cookery
+
+
+def test_first_subject_is_split(cookery):
+    calls = []
+
+    @cookery.action(batch=3)
+    def plain(items, other):
+        calls.append((items, other))
+        return [(i, other) for i in items]
+
+    assert cookery.execute_expression('plain Nums 7 and Value x.') == \
+        [(i, 'x') for i in range(7)]
+    assert calls == [([0, 1, 2], 'x'), ([3, 4, 5], 'x'), ([6], 'x')]
+
+
+def test_same_batches_with_arguments(cookery):
+    calls = []
+
+    @cookery.action('JSON', batch=3)
+    def with_json(subjects, arguments):
+        calls.append(subjects)
+        return [i * arguments['k'] for i in subjects[0]]
+
+    @cookery.action(r'(\w+)', batch=3)
+    def with_regexp(items, label):
+        calls.append(items)
+        return ['{}{}'.format(label, i) for i in items]
+
+    assert cookery.execute_expression(
+        'with_json {"k": 2} Nums 4 and Value x.') == [0, 2, 4, 6]
+    assert calls == [[[0, 1, 2], 'x'], [[3], 'x']]
+    del calls[:]
+    assert cookery.execute_expression('with_regexp a Nums 4.') == \
+        ['a0', 'a1', 'a2', 'a3']
+    assert calls == [[0, 1, 2], [3]]
+
+
+def test_other_values_are_not_split(cookery):
+    @cookery.action(batch=2)
+    def whole(value):
+        return [value]
+
+    assert cookery.execute_expression('whole Value abc.') == ['abc']
+
+
+def test_batches_run_concurrently(cookery):
+    # every batch waits for the other one, so they cannot run in turn
+    barrier = Barrier(2, timeout=5)
+
+    @cookery.action(batch=5, batch_workers=2)
+    def square(items):
+        barrier.wait()
+        return [i * i for i in items]
+
+    assert cookery.execute_expression('square Nums 10.') == \
+        [i * i for i in range(10)]
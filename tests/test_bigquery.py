@@ -0,0 +1,96 @@
+from threading import Event, current_thread
+import pytest
+from cookery.cookery_bigquery import BigQueryClient
+
+FIELDS = [{'name': 'n', 'type': 'INTEGER'},
+          {'name': 'ok', 'type': 'BOOLEAN'},
+          {'name': 'tags', 'type': 'STRING', 'mode': 'REPEATED'}]
+REFERENCE = {'projectId': 'p', 'jobId': 'j'}
+
+
+def row(n):
+    return {'f': [{'v': str(n)}, {'v': 'true' if n % 2 else 'false'},
+                  {'v': [{'v': 't{}'.format(n)}]}]}
+
+
+class Request(object):
+    def __init__(self, response):
+        self.response = response
+
+    def execute(self):
+        return self.response()
+
+
+class Service(object):
+    '''Stands in for the BigQuery API: a job incomplete at first, then
+    three pages of two rows.'''
+
+    def __init__(self):
+        self.calls = []
+        self.fetched = {}
+        self.polls = 0
+
+    def jobs(self):
+        return self
+
+    def query(self, projectId, body):
+        self.calls.append(('query', body['query']))
+        return Request(lambda: {'jobReference': REFERENCE,
+                                'jobComplete': False})
+
+    def getQueryResults(self, projectId, jobId, timeoutMs, pageToken=None):
+        assert (projectId, jobId) == ('p', 'j')
+        self.calls.append(('page', pageToken, current_thread()))
+
+        def response():
+            if pageToken is None and not self.polls:
+                self.polls += 1
+                return {'jobReference': REFERENCE, 'jobComplete': False}
+            index = int(pageToken or 0)
+            page = {'jobReference': REFERENCE, 'jobComplete': True,
+                    'schema': {'fields': FIELDS},
+                    'rows': [row(2 * index), row(2 * index + 1)]}
+            if index < 2:
+                page['pageToken'] = str(index + 1)
+            self.fetched.setdefault(pageToken, Event()).set()
+            return page
+        return Request(response)
+
+
+@pytest.fixture
+def client():
+    client = BigQueryClient()
+    client.service = Service()
+    return client
+
+
+EXPECTED = [{'n': n, 'ok': bool(n % 2), 'tags': ['t{}'.format(n)]}
+            for n in range(6)]
+
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_rows_of_all_pages(client, prefetch):
+    assert list(client.rows({'query': 'q'}, prefetch)) == EXPECTED
+    tokens = [c[1] for c in client.service.calls]
+    assert tokens == ['q', None, None, '1', '2']
+
+
+def test_prefetch_next_page(client):
+    service = client.service
+    rows = client.rows({'query': 'q'})
+    assert next(rows) == EXPECTED[0]
+    # the second page is requested before the first one is consumed
+    assert service.fetched.setdefault('1', Event()).wait(5)
+    assert '2' not in service.fetched
+    assert list(rows) == EXPECTED[1:]
+    threads = [c[2] for c in service.calls[1:]]
+    assert threads[0] is current_thread()
+    assert all(t is not current_thread() for t in threads[2:])
+
+
+def test_no_prefetch(client):
+    service = client.service
+    rows = client.rows({'query': 'q'}, prefetch=False)
+    assert next(rows) == EXPECTED[0]
+    assert [c[1] for c in service.calls] == ['q', None, None]
+    assert list(rows) == EXPECTED[1:]
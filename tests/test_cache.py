@@ -0,0 +1,78 @@
+import os
+from cookery.cookery import Cookery
+from cookery.cookery_cache import ParseCache, collect_garbage
+
+IMPLEMENTATION = '''
+@cookery.action(cache=True)
+def slow(text):
+    with open(cookery.resolve_path('calls.txt'), 'a') as f:
+        f.write(text)
+    return "{}:" + text
+'''
+
+
+def write_project(directory, version):
+    (directory / 'impl.py').write_text(IMPLEMENTATION.format(version))
+    (directory / 'impl.cookery').write_text('slow File t.txt.\n')
+    (directory / 't.txt').write_text('hello\n')
+
+
+def run(directory):
+    cookery = Cookery(cache_dir='cache')
+    with open(str(directory / 'impl.cookery')) as f:
+        return cookery.execute_file(f)
+
+
+def calls(directory):
+    return (directory / 'calls.txt').read_text().splitlines()
+
+
+def test_results_of_file_subjects_are_cached(tmp_path):
+    write_project(tmp_path, 'v1')
+    assert run(tmp_path) == 'v1:hello\n'
+    assert run(tmp_path) == 'v1:hello\n'
+    assert calls(tmp_path) == ['hello']
+
+    (tmp_path / 't.txt').write_text('changed\n')
+    assert run(tmp_path) == 'v1:changed\n'
+    assert calls(tmp_path) == ['hello', 'changed']
+
+
+def test_edited_implementation_invalidates_results(tmp_path):
+    write_project(tmp_path, 'v1')
+    cookery = Cookery(cache_dir='cache')
+    with open(str(tmp_path / 'impl.cookery')) as f:
+        assert cookery.execute_file(f) == 'v1:hello\n'
+
+    write_project(tmp_path, 'v2')
+    os.utime(str(tmp_path / 'impl.py'), ns=(0, 0))
+    with open(str(tmp_path / 'impl.cookery')) as f:
+        assert cookery.execute_file(f) == 'v2:hello\n'
+    assert run(tmp_path) == 'v2:hello\n'
+    assert calls(tmp_path) == ['hello', 'hello']
+
+
+def test_actions_are_not_cached_by_default(tmp_path):
+    (tmp_path / 'impl.py').write_text('''
+@cookery.action()
+def save(text):
+    with open(cookery.resolve_path('out.txt'), 'w') as f:
+        f.write(text)
+    return text
+''')
+    (tmp_path / 'impl.cookery').write_text('save File t.txt.\n')
+    (tmp_path / 't.txt').write_text('hello\n')
+    assert run(tmp_path) == 'hello\n'
+    (tmp_path / 'out.txt').unlink()
+    assert run(tmp_path) == 'hello\n'
+    assert (tmp_path / 'out.txt').read_text() == 'hello\n'
+
+
+def test_loaded_parse_trees_are_kept_by_gc(tmp_path):
+    cache = ParseCache(str(tmp_path))
+    module = Cookery().parse('echo x.')
+    cache.store('echo x.', module)
+    file_name = cache.path('echo x.')
+    os.utime(file_name, (0, 0))
+    assert cache.load('echo x.') is not None
+    assert collect_garbage(str(tmp_path), 24 * 60 * 60) == (0, 0)
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+import pytest
+
+# loaded only by the subcommands using them
+FORBIDDEN = ['cookery.cookery', 'cookery.cookery_cache', 'ply', 'requests',
+             'botocore', 'boto3', 'asyncio']
+
+
+def imports(statement):
+    'Returns names of modules imported by a fresh interpreter.'
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                              statement],
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                             universal_newlines=True)
+    assert process.returncode == 0, process.stderr
+    return {line.split('|')[-1].strip()
+            for line in process.stderr.splitlines()
+            if line.startswith('import time:')}
+
+
+@pytest.fixture(scope='module')
+def startup():
+    return imports('from cookery.toolkit import toolkit\n'
+                   'toolkit(["--help"])')
+
+
+@pytest.mark.parametrize('name', FORBIDDEN)
+def test_help_does_not_import(startup, name):
+    assert 'cookery.toolkit' in startup
+    assert name not in startup
+
+
+def test_subcommand_imports_on_invocation():
+    assert 'ply' in imports('from cookery.toolkit import toolkit\n'
+                            'toolkit(["run", "--help"])')
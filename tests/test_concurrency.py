@@ -0,0 +1,51 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+import pytest
+from cookery.cookery import Cookery
+
+THREADS = 16
+ROUNDS = 50
+
+
+@pytest.fixture
+def data(tmp_path):
+    (tmp_path / 'a.txt').write_text('a\n')
+    return str(tmp_path / 'a.txt')
+
+
+def expressions(thread, data):
+    'Returns (expression, value) evaluated by a thread.'
+    return [('echo t{}-{} File {}.'.format(thread, i, data),
+             't{}-{}'.format(thread, i)) for i in range(ROUNDS)]
+
+
+@pytest.mark.parametrize('trial', range(5))
+def test_threads_share_cookery(data, trial):
+    cookery = Cookery()
+    barrier = Barrier(THREADS)
+
+    def evaluate(thread):
+        barrier.wait()
+        return [(cookery.execute_expression(e), value)
+                for e, value in expressions(thread, data)]
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        for results in pool.map(evaluate, range(THREADS)):
+            for value, expected in results:
+                assert value == expected
+    # every thread borrowed a parser and gave it back
+    assert 1 <= len(cookery.parsers.idle) <= THREADS
+
+
+def test_parse_trees(data):
+    cookery = Cookery()
+    expected = {e: cookery.parse(e).pretty_print()
+                for thread in range(THREADS)
+                for e, _ in expressions(thread, data)}
+
+    def parse(thread):
+        return [cookery.parse(e).pretty_print() == expected[e]
+                for e, _ in expressions(thread, data)]
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        assert all(all(same) for same in pool.map(parse, range(THREADS)))
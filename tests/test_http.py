@@ -0,0 +1,103 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+import pytest
+
+pytest.importorskip('requests')
+
+from cookery.cookery_http import HttpSession  # noqa: E402
+
+DOCUMENTS = {
+    '/a': b'first line\nsecond line\n',
+    '/b': b'b\n',
+    '/c': b'c\n',
+}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address,
+                                     self.headers.get('If-None-Match')))
+        body = DOCUMENTS.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        etag = '"{}"'.format(hash(body))
+        # documents never change
+        if self.headers.get('If-None-Match') == etag or \
+           self.headers.get('If-Modified-Since'):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.requests = []
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server, name):
+    return 'http://127.0.0.1:{}{}'.format(server.server_address[1], name)
+
+
+def test_revalidates_over_one_connection(server):
+    http = HttpSession()
+    assert http.get(url(server, '/a')) == 'first line\nsecond line\n'
+    assert http.get(url(server, '/a')) == 'first line\nsecond line\n'
+    assert http.get(url(server, '/b')) == 'b\n'
+    (_, first, etag), (_, second, revalidated), (_, third, _) = \
+        server.requests
+    assert etag is None and revalidated is not None
+    assert first == second == third
+    http.close()
+
+
+def test_get_all_and_lines(server):
+    http = HttpSession()
+    assert http.get_all([url(server, '/a'), url(server, '/b'),
+                         url(server, '/c')]) == \
+        ['first line\nsecond line\n', 'b\n', 'c\n']
+    assert list(http.lines(url(server, '/a'))) == \
+        ['first line', 'second line']
+    http.close()
+
+
+def test_documents_are_bounded(server):
+    http = HttpSession()
+    http.max_documents = 2
+    for name in ['/a', '/b', '/c']:
+        http.get(url(server, name))
+    assert list(http.documents) == [url(server, '/b'), url(server, '/c')]
+    http.close()
+
+
+def test_download_skips_newer_file(server, tmp_path):
+    http = HttpSession()
+    file_name = str(tmp_path / 'a.txt')
+    assert http.download(url(server, '/a'), file_name) == file_name
+    with open(file_name, 'rb') as f:
+        assert f.read() == DOCUMENTS['/a']
+    with open(file_name, 'w') as f:
+        f.write('local')
+    assert http.download(url(server, '/a'), file_name) == file_name
+    with open(file_name) as f:
+        assert f.read() == 'local'
+    http.close()
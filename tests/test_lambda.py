@@ -0,0 +1,125 @@
+from base64 import b64encode
+from functools import partial
+from io import BytesIO
+from os import path, makedirs, utime
+from types import SimpleNamespace
+import hashlib
+import sys
+import pytest
+from cookery.cookery_lambda import dependencies_key, package, runtime, \
+    write_zip
+
+
+@pytest.fixture
+def project(tmp_path):
+    'Returns (script, cache directory) with the dependency layer built.'
+    cache_dir = str(tmp_path / 'cache')
+    layers = path.join(cache_dir, 'layers')
+    makedirs(layers)
+    # stands in for cookery installed with pip
+    write_zip(path.join(layers, dependencies_key() + '.zip'), {
+        'cookery/__init__.py': (0o644, partial(BytesIO, b'')),
+        'bin/cookery': (0o755, partial(BytesIO, b'#!/bin/sh\n')),
+    })
+    (tmp_path / 'job.cookery').write_text('echo x File job.py.')
+    (tmp_path / 'job.py').write_text('# implementation\n')
+    return str(tmp_path / 'job.cookery'), cache_dir
+
+
+def test_package_is_reproducible(project):
+    script, cache_dir = project
+    zip_name, sha = package(script, 'job', cache_dir)
+    with open(zip_name, 'rb') as f:
+        first = f.read()
+    assert sha == b64encode(hashlib.sha256(first).digest()).decode()
+    # only contents count, not modification times
+    utime(script, (0, 0))
+    assert package(script, 'job', cache_dir) == (zip_name, sha)
+    with open(zip_name, 'rb') as f:
+        assert f.read() == first
+    with open(script, 'a') as f:
+        f.write(' echo y File job.py.')
+    assert package(script, 'job', cache_dir)[1] != sha
+
+
+class Lambda(object):
+    'Stands in for the Lambda API, keeps functions in memory.'
+
+    def __init__(self, calls):
+        self.calls = calls
+        self.functions = {}
+
+    def get_function(self, FunctionName):
+        from botocore.exceptions import ClientError
+
+        if FunctionName not in self.functions:
+            raise ClientError({'Error': {'Code': 'ResourceNotFoundException',
+                                         'Message': FunctionName}},
+                              'GetFunction')
+        return {'Configuration': self.functions[FunctionName]}
+
+    def upload(self, name, code):
+        self.functions[name]['CodeSha256'] = \
+            b64encode(hashlib.sha256(code).digest()).decode()
+
+    def create_function(self, FunctionName, Code, Runtime, **arguments):
+        self.calls.append('create_function')
+        self.functions[FunctionName] = {
+            'FunctionArn': 'arn:aws:lambda:::function:' + FunctionName,
+            'Runtime': Runtime,
+        }
+        self.upload(FunctionName, Code['ZipFile'])
+
+    def update_function_configuration(self, FunctionName, Runtime):
+        self.calls.append('update_function_configuration')
+        self.functions[FunctionName]['Runtime'] = Runtime
+
+    def get_waiter(self, name):
+        return SimpleNamespace(wait=lambda FunctionName: None)
+
+    def update_function_code(self, FunctionName, ZipFile, Publish):
+        self.calls.append('update_function_code')
+        self.upload(FunctionName, ZipFile)
+
+
+class Events(object):
+    def __init__(self, calls):
+        self.calls = calls
+
+    def put_rule(self, **arguments):
+        self.calls.append('put_rule')
+
+    def put_targets(self, **arguments):
+        self.calls.append('put_targets')
+
+
+def test_deploys_only_changes(project, monkeypatch):
+    pytest.importorskip('botocore')
+    from click.testing import CliRunner
+    from cookery.toolkit_lambda import amazon_lambda
+
+    script, cache_dir = project
+    calls = []
+    clients = {'lambda': Lambda(calls), 'events': Events(calls)}
+    monkeypatch.setitem(sys.modules, 'boto3', SimpleNamespace(
+        client=lambda service, **arguments: clients[service]))
+
+    def deploy():
+        del calls[:]
+        result = CliRunner().invoke(amazon_lambda, [
+            '--key', 'k', '--secret', 's', '--arn', 'arn:aws:iam:::role/r',
+            '--cache-dir', cache_dir, script])
+        assert result.exit_code == 0, result.output
+        return calls
+
+    assert deploy() == ['create_function', 'put_rule', 'put_targets']
+    assert deploy() == []
+    with open(script, 'a') as f:
+        f.write(' echo y File job.py.')
+    assert deploy() == ['update_function_code']
+    assert deploy() == []
+    # deployed before the runtime followed the interpreter
+    assert clients['lambda'].functions['job']['Runtime'] == runtime()
+    clients['lambda'].functions['job']['Runtime'] = 'python3.6'
+    assert deploy() == ['update_function_configuration']
+    assert clients['lambda'].functions['job']['Runtime'] == runtime()
@@ -0,0 +1,23 @@
+import os
+from cookery.cookery import Cookery
+
+
+def test_file_subject_is_memoized_until_modified(tmp_path):
+    file_name = tmp_path / 'text.txt'
+    file_name.write_text('one\n')
+    cookery = Cookery()
+
+    @cookery.action()
+    def show(*subjects):
+        return subjects
+
+    expression = 'show File {}.'.format(file_name)
+    assert cookery.execute_expression(expression) == ('one\n',)
+    assert cookery.execute_expression(expression) == ('one\n',)
+    assert (cookery.subject_cache.hits, cookery.subject_cache.misses) == \
+        (1, 1)
+
+    file_name.write_text('two, longer\n')
+    os.utime(file_name, ns=(0, 0))
+    assert cookery.execute_expression(expression) == ('two, longer\n',)
+    assert cookery.subject_cache.misses == 2
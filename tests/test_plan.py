@@ -0,0 +1,140 @@
+from os import getpid
+from time import sleep
+import pytest
+from cookery.cookery import Cookery
+
+
+def numbers(cookery):
+    @cookery.subject('in', r'(\d+)')
+    def nums(n):
+        return list(range(int(n)))
+
+
+def test_mapped_and_unmapped_results_are_cached_apart(tmp_path):
+    cookery = Cookery(cache_dir=str(tmp_path / 'cache'))
+    numbers(cookery)
+    calls = []
+
+    @cookery.action(cache=True)
+    def wrap(value):
+        calls.append(value)
+        return [value]
+
+    for _ in range(2):
+        assert cookery.execute_expression('wrap Nums 3.') == [[0, 1, 2]]
+        assert cookery.execute_expression('wrap Nums[] 3.') == \
+            [[0], [1], [2]]
+        assert cookery.execute_expression('X[] = wrap Nums 3.') == \
+            [[0], [1], [2]]
+    assert calls == [[0, 1, 2], 0, 1, 2, 0, 1, 2]
+
+
+# A is read by B, then reassigned while B waits for the slow S, E is
+# reassigned while its first assignment is still running, e and f take
+# the value of the previous step; delays let later steps finish first
+SCRIPT = '''
+A = tag {"t": "a"} Value 1.
+S = tag {"t": "s", "s": 0.05} Value 0.
+B = tag {"t": "b"} A and S.
+A = tag {"t": "c"} Value 2.
+E = tag {"t": "x", "s": 0.05} Value 3.
+E = tag {"t": "y"} Value 4.
+C = tag {"t": "d", "s": 0.03} A and B.
+tag {"t": "e", "s": 0.01}.
+D = tag {"t": "f", "s": 0.02}.
+A = tag {"t": "g"} D.
+tag {"t": "h"} A and C and E.
+'''
+
+
+def tagging(cookery):
+    @cookery.subject('in', r'(.*)')
+    def value(text):
+        return text
+
+    @cookery.action('JSON')
+    def tag(subjects, arguments):
+        sleep(arguments.get('s', 0))
+        if isinstance(subjects, str):
+            subjects = [subjects]
+        return '{}({})'.format(arguments['t'], ','.join(subjects))
+    return cookery
+
+
+def run(cookery, script=SCRIPT):
+    'Returns the value and the variables of a script.'
+    module = cookery.process_expression(script)
+    value = module.execute(cookery)
+    return value, module.variables
+
+
+def test_dependencies():
+    cookery = tagging(Cookery())
+    plan = cookery.process_expression(SCRIPT).compile(cookery)
+    assert plan.dependencies() == [
+        set(), set(), {0, 1}, {0, 2}, set(), {4}, {2, 3}, {6}, {7}, {3, 6, 8},
+        {5, 6, 9}]
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_parallel_execution_is_sequential_one(executor):
+    expected = run(tagging(Cookery()))
+    b = 'b(a(1),s(0))'
+    d = 'd(c(2),{})'.format(b)
+    g = 'g(f(e({})))'.format(d)
+    assert expected == ('h({},{},y(4))'.format(g, d),
+                        {'A': g, 'B': b, 'C': d, 'D': 'f(e({}))'.format(d),
+                         'E': 'y(4)', 'S': 's(0)'})
+    cookery = tagging(Cookery(workers=4, executor=executor))
+    for _ in range(3):
+        assert run(cookery) == expected
+
+
+
+def mapping(cookery):
+    numbers(cookery)
+    tagging(cookery)
+
+    @cookery.action()
+    def pair(*subjects):
+        return '-'.join(str(s) for s in subjects)
+
+    @cookery.action()
+    def keep(value):
+        return value
+
+    @cookery.action()
+    def double(n):
+        return [n * 2, getpid()]
+    return cookery
+
+
+def test_mapped_subjects_are_zipped():
+    cookery = mapping(Cookery())
+    # the shorter T[] subject ends iteration, Value x goes to every call
+    assert cookery.execute_expression(
+        'pair Nums[] 3 and Value x and Nums[] 4.') == \
+        ['0-x-0', '1-x-1', '2-x-2']
+    assert cookery.execute_expression('X[] = pair Nums 2 and Nums 3.') == \
+        ['0-0', '1-1']
+
+
+def test_mapped_assignment_of_the_previous_value():
+    cookery = mapping(Cookery())
+    module = cookery.process_expression('A = keep Nums 3. X[] = double.')
+    assert [n for n, _ in module.execute(cookery)] == [0, 2, 4]
+    assert [n for n, _ in module.variables['X']] == [0, 2, 4]
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_mapped_calls_on_workers(executor):
+    cookery = mapping(Cookery(map_workers=2, map_executor=executor))
+    assert cookery.execute_expression('pair Nums[] 20 and Value x.') == \
+        ['{}-x'.format(i) for i in range(20)]
+    results = cookery.execute_expression('X[] = double Nums[] 20.')
+    assert [n for n, _ in results] == list(range(0, 40, 2))
+    pids = {pid for _, pid in results}
+    if executor == 'process':
+        assert getpid() not in pids
+    else:
+        assert pids == {getpid()}
@@ -0,0 +1,59 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from cookery.cookery import Cookery
+from cookery.cookery_registry import write_manifest
+
+THREADS = 8
+
+# (file, source) of a project, every file records that it was executed
+PROJECT = [('project.py', '''
+@cookery.action('(.*)')
+def echo(subjects, text):
+    return 'project ' + text
+'''), ('loud.py', '''
+@cookery.action('(.*)')
+def shout(subjects, text):
+    return text.upper()
+''')]
+RECORD = '''from os import path
+
+with open(path.join(path.dirname(__file__), 'loads.txt'), 'a') as f:
+    f.write(path.basename(__file__) + '\\n')
+'''
+
+
+def test_concurrent_first_lookups(tmp_path):
+    (tmp_path / 'a.txt').write_text('a\n')
+    for _ in range(20):
+        cookery = Cookery()
+        barrier = Barrier(THREADS)
+
+        def lookup(i):
+            barrier.wait()
+            return cookery.execute_expression('echo x{} File {}.'.format(
+                i, tmp_path / 'a.txt'))
+
+        with ThreadPoolExecutor(THREADS) as pool:
+            assert list(pool.map(lookup, range(THREADS))) == \
+                ['x{}'.format(i) for i in range(THREADS)]
+
+
+def test_project_manifest(tmp_path):
+    for f, source in PROJECT:
+        (tmp_path / f).write_text(RECORD + source)
+    (tmp_path / 'a.txt').write_text('a\n')
+    (tmp_path / 'first.cookery').write_text('echo x File a.txt.')
+    (tmp_path / 'second.cookery').write_text('shout hi File a.txt.')
+    write_manifest(str(tmp_path))
+    cookery = Cookery()
+    assert cookery.execute_expression('echo y File {}.'.format(
+        tmp_path / 'a.txt')) == 'y'
+    # names of the project take precedence over the standard library, its
+    # files are executed when their names are used
+    assert cookery.execute_file(str(tmp_path / 'first.cookery')) == \
+        'project x'
+    assert (tmp_path / 'loads.txt').read_text() == 'project.py\n'
+    assert cookery.execute_file(str(tmp_path / 'second.cookery')) == 'HI'
+    assert cookery.execute_file(str(tmp_path / 'first.cookery')) == \
+        'project x'
+    assert (tmp_path / 'loads.txt').read_text() == 'project.py\nloud.py\n'
@@ -0,0 +1,34 @@
+import random
+import pytest
+from cookery.cookery_scanner import CookeryScanner
+from cookery.cookery_tables import load_tables
+from cookery.toolkit_grammar import EXPRESSIONS, tokens
+
+# pieces of random expressions: names, keywords, paths, JSON, separators
+# and characters that are illegal in some states
+FRAGMENTS = ['do', 'read', 'File', 'X', 'T[]', 'and', 'if', 'with', 'as',
+             'import', ' ', ' ', '.', '. ', '\n', ':', '/tmp/a.txt',
+             '{"a": 1}', "'m'", '"m/n"', 'x-y', 'A1', '# c\n', 'http://e.com',
+             '{', '}', '[', ']', '=', ' = ', 'a.b', 'é', '\t']
+
+
+@pytest.fixture(scope='module')
+def lexers():
+    return load_tables().new_lexer(), CookeryScanner()
+
+
+@pytest.mark.parametrize('expression', EXPRESSIONS)
+def test_samples(lexers, expression):
+    lexer, scanner = lexers
+    assert tokens(scanner, expression) == tokens(lexer, expression)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random(lexers, seed):
+    lexer, scanner = lexers
+    rng = random.Random(seed)
+    for _ in range(500):
+        expression = ''.join(rng.choice(FRAGMENTS)
+                             for _ in range(rng.randint(1, 12)))
+        assert tokens(scanner, expression) == tokens(lexer, expression), \
+            expression
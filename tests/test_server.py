@@ -0,0 +1,41 @@
+from contextlib import contextmanager
+from threading import Thread
+import sys
+from cookery.cookery import Cookery
+from cookery.cookery_server import CookeryServer, submit
+
+IMPLEMENTATION = '''
+@cookery.action('(.*)')
+def say(subjects, text):
+    print(text)
+    return text
+'''
+
+
+@contextmanager
+def serving(socket_path):
+    # started in the test, standard output is replaced by pytest before
+    stdout = sys.stdout
+    server = CookeryServer(socket_path, lambda: Cookery(workers=4))
+    Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        sys.stdout = stdout
+
+
+def test_output_of_parallel_activities(tmp_path):
+    (tmp_path / 'a.txt').write_text('a\n')
+    (tmp_path / 'job.py').write_text(IMPLEMENTATION)
+    (tmp_path / 'job.cookery').write_text(
+        'A = say one File a.txt. B = say two File a.txt. say three A.')
+    with serving(str(tmp_path / 'cookery.sock')) as server:
+        messages = list(submit(server.server_address,
+                               {'file': str(tmp_path / 'job.cookery')}))
+    assert messages[-2:] == [{'value': 'three'}, {'end': True}]
+    output = ''.join(m['output'] for m in messages if 'output' in m)
+    # lines of parallel activities can be interleaved
+    for text in ['one', 'two', 'three']:
+        assert text in output
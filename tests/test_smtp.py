@@ -0,0 +1,84 @@
+from email import message_from_bytes, policy
+from threading import Thread
+import socketserver
+import pytest
+from cookery.cookery_smtp import SmtpPool, message
+
+
+class Handler(socketserver.StreamRequestHandler):
+    'Speaks enough of SMTP to accept messages, without TLS and login.'
+
+    def handle(self):
+        self.server.connections += 1
+        self.wfile.write(b'220 test\r\n')
+        data = None
+        for line in self.rfile:
+            if data is not None:
+                if line == b'.\r\n':
+                    self.server.messages.append(b''.join(data))
+                    data = None
+                    self.wfile.write(b'250 ok\r\n')
+                else:
+                    data.append(line[1:] if line.startswith(b'..') else line)
+                continue
+            command = line.strip().upper()
+            self.server.commands.append(command.split(b':')[0])
+            if command.startswith(b'EHLO'):
+                self.wfile.write(b'250-test\r\n250 8BITMIME\r\n')
+            elif command == b'DATA':
+                data = []
+                self.wfile.write(b'354 go on\r\n')
+            elif command == b'QUIT':
+                self.wfile.write(b'221 bye\r\n')
+                return
+            else:
+                self.wfile.write(b'250 ok\r\n')
+
+
+@pytest.fixture
+def server():
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.commands = []
+    server.messages = []
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield {'smtp_host': '127.0.0.1', 'smtp_port': server.server_address[1],
+           'smtp_user': '', 'starttls': False}, server
+    server.shutdown()
+    server.server_close()
+
+
+def test_messages_share_connection(server):
+    settings, smtp = server
+    pool = SmtpPool()
+    attachment = bytes(range(256)) * 1000
+    for i in range(3):
+        pool.send('a@example.com', ['b@example.com'], message(
+            'a@example.com', ['b@example.com'], 'subject {}'.format(i),
+            'body {}\n.\n'.format(i), [('data.bin', attachment),
+                                       ('notes.txt', ['.first\n', 'line\n'])]),
+            settings)
+    pool.close()
+    assert smtp.connections == 1
+    assert sum(c.startswith(b'EHLO') for c in smtp.commands) == 1
+    assert smtp.commands.count(b'DATA') == 3
+    for i, raw in enumerate(smtp.messages):
+        mail = message_from_bytes(raw, policy=policy.default)
+        assert mail['Subject'] == 'subject {}'.format(i)
+        body, data, notes = [part.get_payload(decode=True)
+                             for part in mail.iter_parts()]
+        assert body == 'body {}\n.\n'.format(i).encode()
+        assert data == attachment
+        assert notes == b'.first\nline\n'
+
+
+def test_connection_is_lent_again(server):
+    settings, smtp = server
+    pool = SmtpPool()
+    pool.send('a@example.com', ['b@example.com'],
+              message('a@example.com', ['b@example.com'], 's', 'b'), settings)
+    with pool.connection(settings) as connection:
+        assert connection.noop()[0] == 250
+    pool.close()
+    assert smtp.connections == 1
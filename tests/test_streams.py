@@ -0,0 +1,84 @@
+from io import StringIO
+import pytest
+from cookery import cookery_mapped
+from cookery.cookery import Cookery
+from cookery.cookery_scanner import CookeryScanner
+from cookery.cookery_stream import iter_statements
+
+
+def test_condition_receives_materialized_file(tmp_path):
+    file_name = tmp_path / 'text.txt'
+    file_name.write_text('hello\n')
+    cookery = Cookery()
+
+    @cookery.condition()
+    def upper(text):
+        return text.upper()
+
+    @cookery.action()
+    def show(*subjects):
+        return subjects
+
+    assert cookery.execute_expression(
+        'show File {} with upper.'.format(file_name)) == ('HELLO\n',)
+
+
+def test_large_file_is_decoded_for_actions(tmp_path, monkeypatch):
+    # every file is mapped by the File subject
+    monkeypatch.setattr(cookery_mapped, 'MMAP_THRESHOLD', 0)
+    file_name = tmp_path / 'text.txt'
+    file_name.write_text('two words\n')
+    cookery = Cookery()
+
+    @cookery.action()
+    def split(text):
+        return text.split()
+
+    @cookery.action(stream=True)
+    def mapped(*subjects):
+        return [type(s).__name__ for s in subjects]
+
+    assert cookery.execute_expression(
+        'split File {}.'.format(file_name)) == ['two', 'words']
+    assert cookery.execute_expression(
+        'split MappedFile {}.'.format(file_name)) == ['two', 'words']
+    assert cookery.execute_expression(
+        'mapped File {}.'.format(file_name)) == ['MappedFile']
+
+
+SCRIPT = """A = tag {"t": "a",
+  "n": 1} Value x.
+# a comment. Value y.
+B = tag {"t": "b"} A.  C = tag {"t": "c"} B.
+tag {"t": "d"} C"""
+
+
+@pytest.mark.parametrize('scanner', [False, True])
+def test_statements_of_a_stream(scanner, caplog):
+    lexer = Cookery(scanner=scanner).lexer.clone()
+    assert list(iter_statements(StringIO(SCRIPT), lexer)) == [
+        'A = tag {"t": "a",\n  "n": 1} Value x.',
+        '\n# a comment. Value y.\n'
+        'B = tag {"t": "b"} A.  C = tag {"t": "c"} B.',
+        '\ntag {"t": "d"} C',
+    ]
+    # incomplete JSON is not an error
+    assert 'Illegal character' not in caplog.text
+
+
+class CountingScanner(CookeryScanner):
+    tokens = 0
+
+    def token(self):
+        CountingScanner.tokens += 1
+        return super().token()
+
+
+def test_lines_are_not_lexed_again():
+    lines = 200
+    script = 'show Value 0' + ''.join(
+        ' and\nValue {}'.format(i) for i in range(1, lines)) + '.\n'
+    assert len(list(iter_statements(StringIO(script),
+                                    CountingScanner()))) == 1
+    # a few tokens a line, not all the tokens of the statement
+    assert CountingScanner.tokens < 10 * lines